@@ -0,0 +1,88 @@
+"""
+Сравнение представлений строк RoomRepository.get_all():
+старое — новый класс type('Room', ...) на каждую строку,
+новое — один класс models.Room со __slots__.
+
+Запуск из корня проекта:
+    python benchmarks/bench_rows.py [число_номеров]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Room  # noqa: E402
+
+QUERY = "SELECT id, number, room_type, capacity, price, status FROM rooms ORDER BY number"
+
+
+def old_row_to_room(row):
+    return type('Room', (), {
+        'id': row[0],
+        'number': row[1],
+        'room_type': row[2],
+        'capacity': row[3],
+        'price': row[4],
+        'status': row[5]
+    })()
+
+
+def get_all_old(conn):
+    return [old_row_to_room(row) for row in conn.execute(QUERY).fetchall()]
+
+
+def get_all_new(conn):
+    return [Room(*row) for row in conn.execute(QUERY)]
+
+
+def make_db(path, count):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE rooms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            number INTEGER UNIQUE NOT NULL,
+            room_type TEXT NOT NULL,
+            capacity INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            status TEXT DEFAULT 'free'
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO rooms (number, room_type, capacity, price) VALUES (?, ?, ?, ?)",
+        ((100 + i, "Люкс", 1 + i % 5, 1000 + i) for i in range(count))
+    )
+    conn.commit()
+    return conn
+
+
+def measure(name, func, conn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(conn)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    rows = func(conn)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28} {best * 1000:9.1f} мс   {size / 1024 / 1024:8.1f} МБ   ({len(rows)} строк)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = make_db(os.path.join(tmp, "bench.db"), count)
+        print(f"get_all() на {count} номерах: лучшее время из 5 и память результата")
+        measure("type('Room', ...) на строку", get_all_old, conn)
+        measure("Room со __slots__", get_all_new, conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
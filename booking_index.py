@@ -0,0 +1,146 @@
+import bisect
+from datetime import date
+
+
+def day_number(iso_date: str) -> int:
+    """'2025-03-15' → порядковый номер дня (date.toordinal)"""
+    return date.fromisoformat(iso_date).toordinal()
+
+
+class RoomIntervals:
+    """
+    Брони одного номера: два отсортированных списка — дни заезда и дни выезда.
+
+    Интервалы включают оба конца (как и в запросах к БД: date_start <= конец
+    и date_end >= начало), поэтому число броней, пересекающих [start, end], —
+    это «заезд не позже end» минус «выезд раньше start». Оба слагаемых
+    считаются бинарным поиском за O(log n).
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start: int, end: int):
+        bisect.insort(self.starts, start)
+        bisect.insort(self.ends, end)
+
+    def remove(self, start: int, end: int):
+        del self.starts[bisect.bisect_left(self.starts, start)]
+        del self.ends[bisect.bisect_left(self.ends, end)]
+
+    def count_overlapping(self, start: int, end: int) -> int:
+        if start > end:
+            return 0
+        return bisect.bisect_right(self.starts, end) - bisect.bisect_left(self.ends, start)
+
+    def active_on(self, day: int) -> int:
+        """Сколько броней действует в день day."""
+        return bisect.bisect_right(self.starts, day) - bisect.bisect_left(self.ends, day)
+
+    def peak(self, start: int, end: int, skip: tuple | None = None) -> int:
+        """
+        Максимум одновременно проживающих за период [start, end] (sweep line).
+
+        Стартуем с числа броней, действующих в день start, и проходим по
+        событиям внутри периода: заезд +1 в свой день, выезд −1 на следующий
+        день после date_end. skip — (start, end) брони, которую не учитывать.
+        """
+        if start > end:
+            return 0
+        active = self.active_on(start)
+
+        lo, hi = bisect.bisect_right(self.starts, start), bisect.bisect_right(self.starts, end)
+        events = [(day, 1) for day in self.starts[lo:hi]]
+        lo, hi = bisect.bisect_left(self.ends, start), bisect.bisect_left(self.ends, end)
+        events.extend((day + 1, -1) for day in self.ends[lo:hi])
+
+        if skip and skip[0] <= end and skip[1] >= start:
+            skip_start, skip_end = skip
+            if skip_start <= start:
+                active -= 1
+            else:
+                events.append((skip_start, -1))
+            if skip_end < end:
+                events.append((skip_end + 1, 1))
+
+        # в один и тот же день выезды (−1) обрабатываются раньше заездов (+1)
+        events.sort()
+        peak = active
+        for _, delta in events:
+            active += delta
+            if active > peak:
+                peak = active
+        return peak
+
+
+class BookingIndex:
+    """
+    Индекс броней в памяти: {room_id: RoomIntervals} + {client_id: (room_id, start, end)}.
+
+    Загружается один раз из БД и дальше поддерживается репозиторием
+    при добавлении, изменении и удалении клиентов.
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._bookings = {}
+
+    def load(self, rows):
+        """rows — итерируемое (client_id, room_id, date_start_iso, date_end_iso)."""
+        self._rooms.clear()
+        self._bookings.clear()
+        for client_id, room_id, date_start, date_end in rows:
+            self.add(client_id, room_id, date_start, date_end)
+
+    def add(self, client_id: int, room_id: int, date_start: str, date_end: str):
+        start, end = day_number(date_start), day_number(date_end)
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = RoomIntervals()
+        room.add(start, end)
+        self._bookings[client_id] = (room_id, start, end)
+
+    def remove(self, client_id: int):
+        booking = self._bookings.pop(client_id, None)
+        if booking is None:
+            return
+        room_id, start, end = booking
+        self._rooms[room_id].remove(start, end)
+
+    def rekey(self, old_client_id, new_client_id: int):
+        """Переносит бронь на другой ключ (временный ключ импорта → id из БД)."""
+        self._bookings[new_client_id] = self._bookings.pop(old_client_id)
+
+    def update(self, client_id: int, room_id: int, date_start: str, date_end: str):
+        self.remove(client_id)
+        self.add(client_id, room_id, date_start, date_end)
+
+    def occupancy(self, room_id: int, date_start: str, date_end: str, exclude_client_id: int = None) -> int:
+        """Сколько броней номера пересекают период (бронь exclude_client_id не учитывается)."""
+        start, end = day_number(date_start), day_number(date_end)
+        room = self._rooms.get(room_id)
+        count = room.count_overlapping(start, end) if room else 0
+
+        excluded = self._bookings.get(exclude_client_id)
+        if excluded and excluded[0] == room_id and excluded[1] <= end and excluded[2] >= start:
+            count -= 1
+        return count
+
+    def is_available(self, room_id: int, date_start: str, date_end: str, exclude_client_id: int = None) -> bool:
+        return self.occupancy(room_id, date_start, date_end, exclude_client_id) == 0
+
+    def peak_occupancy(self, room_id: int, date_start: str, date_end: str, exclude_client_id: int = None) -> int:
+        """
+        Настоящая пиковая загрузка номера по дням периода.
+        В отличие от occupancy(), непересекающиеся между собой брони не складываются.
+        """
+        room = self._rooms.get(room_id)
+        if room is None:
+            return 0
+        skip = None
+        excluded = self._bookings.get(exclude_client_id)
+        if excluded and excluded[0] == room_id:
+            skip = excluded[1:]
+        return room.peak(day_number(date_start), day_number(date_end), skip)
@@ -1,17 +1,35 @@
+import bisect
+
 from PyQt5 import QtWidgets, QtCore
 from dialogs import AddGuestsDialog, EditClientDialog
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject
+from table_models import ClientTableModel
+from threads import ClientSearchThread
 
 class ClientController(QObject):
-    clients_changed = pyqtSignal()
+    # Пауза после последнего нажатия клавиши перед запуском поиска
+    SEARCH_DELAY_MS = 250
 
-    def __init__(self, window, table_widget, room_db, client_db):
+    def __init__(self, window, table_view, room_db, client_db):
         super().__init__()
         self.window = window
-        self.table = table_widget
+        self.table = table_view
         self.client_db = client_db
         self.room_db = room_db
 
+        self.model = ClientTableModel(self)
+        self.table.setModel(self.model)
+        self.table.setColumnHidden(ClientTableModel.ID_COLUMN, True)  # скрываем ID
+
+        # Поиск: таймер-дебаунс + фоновый поток; ответы старых запросов отбрасываются по generation
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.search_clients)
+        self._search_generation = 0
+        self._search_threads = set()
+        self._last_search = None  # (fio_text, room_id, [Booking]) — полные результаты, база для сужения
+
         self._load_room_search_combobox()
 
         self._connect_signals()
@@ -22,68 +40,161 @@ class ClientController(QObject):
         self.window.comboRoomSearch.clear()
         self.window.comboRoomSearch.addItem("Все номера", None)
         for room in self.room_db.get_all():
-            text = f"{room.number} — {room.room_type} ({room.capacity} чел.)"
-            self.window.comboRoomSearch.addItem(text, room.id)
+            self.window.comboRoomSearch.addItem(self._room_text(room), room.id)
+
+    @staticmethod
+    def _room_text(room):
+        return f"{room.number} — {room.room_type} ({room.capacity} чел.)"
+
     def _connect_signals(self):
         self.window.pushButtonAddClients.clicked.connect(self.add_client)
         self.window.pushButtonEditClients.clicked.connect(self.edit_client)
         self.window.pushButtonRemoveClients.clicked.connect(self.remove_client)
 
         # Поиск
-        self.window.lineFIO_clientEdit.textChanged.connect(self.search_clients)
+        self.window.lineFIO_clientEdit.textChanged.connect(self._search_timer.start)
         self.window.comboRoomSearch.currentTextChanged.connect(self.search_clients)
 
-    def _fill_clients_table(self, clients):
-        self.table.setRowCount(0)
+        # Точечные обновления после записи в БД
+        self.client_db.signals.changed.connect(self._on_clients_changed)
+        self.room_db.signals.changed.connect(self._on_rooms_changed)
+
+    def _fill_clients_table(self, clients, fio_text="", room_id=None):
+        """
+        Показывает первую страницу броней; следующие страницы по тем же фильтрам
+        модель догрузит при прокрутке. Неполная страница — это все результаты:
+        они запоминаются как база для сужения поиска.
+        """
+        if len(clients) < self.client_db.PAGE_SIZE:
+            self.model.set_bookings(clients)
+            self._last_search = (fio_text, room_id, clients)
+        else:
+            self.model.set_bookings(
+                clients,
+                lambda after, limit=self.client_db.PAGE_SIZE: self.client_db.get_page(fio_text, room_id, after, limit)
+            )
+            self._last_search = None
 
-        for client_id, fio, room_number, room_type, date_start, date_end, _ in clients:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
+    def _client_matches(self, client):
+        """Подходит ли клиент под текущий фильтр (ФИО и номер комнаты)."""
+        fio_text = self.window.lineFIO_clientEdit.text().strip().lower()
+        selected_room_id = self.window.comboRoomSearch.currentData()
 
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(fio))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(room_number)))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(date_start))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(date_end))
+        if fio_text and fio_text not in client.fio.lower():
+            return False
+        return selected_room_id is None or client.room_id == selected_room_id
 
-            id_item = QtWidgets.QTableWidgetItem(str(client_id))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row, 4, id_item)
+    def _on_clients_changed(self, change):
+        """Правит только затронутые строки таблицы (ChangeSet от ClientRepository)."""
+        # Результаты прошлых поисков устарели; идущий поиск может не увидеть запись — перезапускаем
+        self._last_search = None
+        if self._search_threads:
+            self.search_clients()
+            return
+
+        if change.reset:
+            self.search_clients()
+            return
+
+        for client_id in change.deleted:
+            self.model.remove_client(client_id)
+
+        # Изменённая бронь могла переехать (дата заезда) или выпасть из фильтра
+        for client in change.updated + change.inserted:
+            self.model.remove_client(client.id)
+            if self._client_matches(client):
+                self.model.insert_booking(client)
+
+    def _on_rooms_changed(self, change):
+        """Номер переименован/добавлен/удалён: правим выпадающий список и колонку «Номер комнаты»."""
+        if change.reset or change.updated:
+            self._last_search = None  # в прошлых результатах могли остаться старые номера комнат
+        if change.reset:
+            self._load_room_search_combobox()
+            self.search_clients()
+            return
+
+        combo = self.window.comboRoomSearch
+        selected_room_id = combo.currentData()
+
+        combo.blockSignals(True)
+        for room_id in change.deleted:
+            index = combo.findData(room_id)
+            if index > 0:
+                combo.removeItem(index)
+        for room in change.updated:
+            index = combo.findData(room.id)
+            if index > 0:
+                combo.removeItem(index)
+        for room in change.updated + change.inserted:
+            # Пункты после «Все номера» отсортированы по номеру комнаты
+            index = bisect.bisect_right(
+                range(1, combo.count()), room.number,
+                key=lambda i: int(combo.itemText(i).split(" — ")[0])
+            ) + 1
+            combo.insertItem(index, self._room_text(room), room.id)
+        index = combo.findData(selected_room_id)
+        combo.setCurrentIndex(max(index, 0))
+        combo.blockSignals(False)
+
+        if combo.currentData() != selected_room_id:
+            self.search_clients()
+            return
+
+        for room in change.updated:
+            self.model.set_room_number(room.id, room.number)
 
     def load_clients_from_db(self):
-        clients = self.client_db.get_all_with_room_info()
+        clients = self.client_db.get_page()
         self._fill_clients_table(clients)
         self.window.statusbar.showMessage(f"Загружено клиентов: {len(clients)}", 3000)
 
     def search_clients(self):
+        """
+        Запускает поиск по текущим фильтрам в фоновом потоке.
+        Предыдущий незавершённый поиск отменяется. Если строка ФИО лишь
+        продолжает прошлую (и номер тот же), сужаются прошлые результаты.
+        """
+        self._search_timer.stop()
         fio_text = self.window.lineFIO_clientEdit.text().strip().lower()
-        selected_room_id = self.window.comboRoomSearch.currentData()
+        room_id = self.window.comboRoomSearch.currentData()
 
-        all_clients = self.client_db.get_all_with_room_info()
+        self._search_generation += 1
+        for thread in self._search_threads:
+            thread.requestInterruption()
 
-        results = []
-
-        for client in all_clients:
-            client_id, fio, room_number, room_type, date_start, date_end, room_id = client
-            fio_lower = fio.lower()
-
-            if fio_text and fio_text not in fio_lower:
-                continue
-
-            # Поиск по номеру комнаты
-            if selected_room_id is not None and room_id != selected_room_id:
-                continue
-
-            results.append(client)
-        self._fill_clients_table(results)
+        if not fio_text and room_id is None:
+            self.load_clients_from_db()
+            return
 
+        base = None
+        if self._last_search is not None:
+            last_text, last_room_id, last_results = self._last_search
+            if fio_text.startswith(last_text) and last_room_id in (None, room_id):
+                base = last_results
+                if last_room_id != room_id:
+                    base = [client for client in base if client.room_id == room_id]
+
+        thread = ClientSearchThread(self.client_db, fio_text, room_id, self._search_generation, base,
+                                    limit=self.client_db.PAGE_SIZE)
+        thread.found.connect(
+            lambda generation, results: self._on_search_found(generation, fio_text, room_id, results)
+        )
+        thread.finished.connect(lambda: self._search_threads.discard(thread))
+        self._search_threads.add(thread)
+        thread.start()
+
+    def _on_search_found(self, generation, fio_text, room_id, results):
+        if generation != self._search_generation:
+            return  # пришёл ответ на устаревший запрос
+        self._fill_clients_table(results, fio_text, room_id)
         self.window.statusbar.showMessage(f"Найдено: {len(results)} клиентов", 3000)
 
     def add_client(self):
         dialog = AddGuestsDialog(self.client_db, self.window)
 
         for room in self.room_db.get_all():
-            text = f"{room.number} — {room.room_type} ({room.capacity} чел.)"
-            dialog.combo_room.addItem(text, room.id)
+            dialog.combo_room.addItem(self._room_text(room), room.id)
 
         if dialog.exec_() != QtWidgets.QDialog.Accepted:
             return
@@ -95,20 +206,14 @@ class ClientController(QObject):
         date_end = data["date_end"].toString("dd.MM.yyyy")
 
         try:
-            for guest in guests:
-                self.client_db.add_client(
-                    fio=guest["fio"],
-                    room_id=room_id,
-                    date_start=date_start,
-                    date_end=date_end
-                )
-
-            # Обновляем интерфейс
-            self.load_clients_from_db()
-
-            # Переключаемся на вкладку с номерами, чтобы было видно обновление
-            self.clients_changed.emit()
+            self.client_db.add_clients(
+                fios=[guest["fio"] for guest in guests],
+                room_id=room_id,
+                date_start=date_start,
+                date_end=date_end
+            )
 
+            # Таблицы обновляются по сигналам репозиториев (только новые строки)
             QtWidgets.QMessageBox.information(
                 self.window,
                 "Успех",
@@ -119,20 +224,20 @@ class ClientController(QObject):
             return
 
     def edit_client(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QtWidgets.QMessageBox.warning(self.window, "Ошибка", "Выберите клиента!")
             return
 
-        client_id = int(self.table.item(row, 4).text())
-        current_fio = self.table.item(row, 0).text()
+        client_id = self.model.client_id(row)
+        current_fio = self.model.index(row, 0).data()
 
-        dialog = EditClientDialog(self.client_db, self.room_db, self.window)
+        dialog = EditClientDialog(self.client_db, self.room_db, self.window, client_id=client_id)
         dialog.setWindowTitle("Редактировать клиента")
         dialog.lineFIO.setText(current_fio)
 
-        dialog.dateStart.setDate(QtCore.QDate.fromString(self.table.item(row, 2).text(), "dd.MM.yyyy"))
-        dialog.dateEnd.setDate(QtCore.QDate.fromString(self.table.item(row, 3).text(), "dd.MM.yyyy"))
+        dialog.dateStart.setDate(QtCore.QDate.fromString(self.model.index(row, 2).data(), "dd.MM.yyyy"))
+        dialog.dateEnd.setDate(QtCore.QDate.fromString(self.model.index(row, 3).data(), "dd.MM.yyyy"))
 
         if dialog.exec_() != QtWidgets.QDialog.Accepted:
             return
@@ -148,17 +253,13 @@ class ClientController(QObject):
                 date_end=data["date_end"].toString("dd.MM.yyyy")
             )
 
-            self.load_clients_from_db()
-
-            self.clients_changed.emit()
-
             QtWidgets.QMessageBox.information(self.window, "Успех", "Клиент обновлён!")
         except Exception as e:
             QtWidgets.QMessageBox.critical(self.window, "Ошибка", str(e))
 
     def remove_client(self):
         rows = sorted(
-            {index.row() for index in self.table.selectedIndexes()},
+            {index.row() for index in self.table.selectionModel().selectedIndexes()},
             reverse=True
         )
 
@@ -189,18 +290,11 @@ class ClientController(QObject):
 
         if msg.clickedButton() != btn_yes:
             return
-        client_ids = [
-            int(self.table.item(row, 4).text())
-            for row in rows
-        ]
+        client_ids = [self.model.client_id(row) for row in rows]
 
         try:
             self.client_db.delete_clients(client_ids)
 
-            self.load_clients_from_db()
-
-            self.clients_changed.emit()
-
             QtWidgets.QMessageBox.information(
                 self.window,
                 "Успех",
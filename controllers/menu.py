@@ -1,15 +1,6 @@
 from PyQt5 import QtWidgets
-from PyQt5.QtCore import QObject, pyqtSignal
 
 
-class MenuSignals(QObject):
-    csv_imported_clients = pyqtSignal()
-    csv_imported_rooms = pyqtSignal()
-    csv_imported_workers = pyqtSignal()
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
 class MenuController:
     """
     Отвечает только за:
@@ -24,7 +15,6 @@ class MenuController:
         self.db_client = db_client
         self.db_room = db_room
         self.db_worker = db_worker
-        self.signals = MenuSignals()
         self._connect_signals()
 
     def _connect_signals(self):
@@ -41,18 +31,29 @@ class MenuController:
         # Справка
         self.window.about_action.triggered.connect(self.show_help)
 
+    def _report_period(self) -> str:
+        """Период отчёта для заголовка экспорта: «Март 2025» или «Январь 2025 — Март 2025»."""
+        start = self.window.comboBox_MonthYear.currentText()
+        end = self.window.comboBox_MonthYearEnd.currentText()
+        return start if start == end else f"{start} — {end}"
+
     def _get_current_table(self):
         index = self.window.tabWidget.currentIndex()
         if index == 0:
-            return self.window.tableWidgetClients
+            return self.window.tableViewClients
         elif index == 1:
-            return self.window.tableWidget_Rooms
+            return self.window.tableViewRooms
         elif index == 2:
             return self.window.tableWidget_Workers
         elif index == 3:
             return self.window.tableView_Report
         return None
 
+    def _load_all_rows(self, table):
+        """Клиенты подгружаются страницами при прокрутке — перед экспортом догружаем остальные."""
+        if table is self.window.tableViewClients:
+            table.model().fetch_all()
+
     # =================== Файл ===================
     def open_csv(self):
         index = self.window.tabWidget.currentIndex()
@@ -73,16 +74,25 @@ class MenuController:
         try:
             if index == 0:
                 result = self.db_client.import_from_csv(path)
-                self.signals.csv_imported_clients.emit()
             elif index == 1:
                 result = self.db_room.import_from_csv(path)
-                self.signals.csv_imported_rooms.emit()
             elif index == 2:
-                result = self.db_worker.import_from_csv(path)
-                self.signals.csv_imported_workers.emit()
+                answer = QtWidgets.QMessageBox.question(
+                    self.window,
+                    "Импорт сотрудников",
+                    "Обновлять данные уже существующих сотрудников (по ФИО)?\n\n"
+                    "«Нет» — такие строки будут пропущены.",
+                    QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+                    QtWidgets.QMessageBox.No
+                )
+                result = self.db_worker.import_from_csv(
+                    path, update_existing=answer == QtWidgets.QMessageBox.Yes
+                )
 
             # Показ сообщения
             msg = f"Импорт завершён!\nДобавлено: {result.get('added', 0)}"
+            if result.get('updated'):
+                msg += f"\nОбновлено: {result['updated']}"
             if result.get('errors'):
                 msg += f"\nОшибок: {len(result['errors'])}\n" + "\n".join(result['errors'][:10])
             QtWidgets.QMessageBox.information(self.window, "Импорт CSV", msg)
@@ -103,6 +113,7 @@ class MenuController:
             return
 
         try:
+            self._load_all_rows(table)
             self.csv.save_table_to_csv(table, path)
             QtWidgets.QMessageBox.information(self.window, "Успех", "Данные сохранены в CSV")
         except Exception:
@@ -125,7 +136,7 @@ class MenuController:
                 return
         else:
             # Проверка наличия таблицы для остальных вкладок
-            if not table or table.rowCount() == 0:
+            if not table or table.model().rowCount() == 0:
                 QtWidgets.QMessageBox.warning(
                     self.window,
                     "Нет данных",
@@ -144,8 +155,9 @@ class MenuController:
             return  # Пользователь отменил
 
         # Экспорт
+        self._load_all_rows(table)
         if current_index == 3:
-            month_name = self.window.comboBox_MonthYear.currentText()
+            month_name = self._report_period()
             success = self.export.export_tableview_to_pdf(table, path, month_name)
         else:
             tab_name = self.window.tabWidget.tabText(current_index)
@@ -200,8 +212,9 @@ class MenuController:
             return  # Пользователь отменил
 
         # Экспорт
+        self._load_all_rows(table)
         if current_index == 3:
-            month_name = self.window.comboBox_MonthYear.currentText()
+            month_name = self._report_period()
             success = self.export.export_tableview_to_html(table, path, month_name)
         else:
             success = self.export.export_table_to_html(table, path)
@@ -1,9 +1,19 @@
 from PyQt5 import QtWidgets
 from PyQt5.QtGui import QStandardItemModel, QStandardItem, QBrush, QColor, QFont
-from PyQt5.QtCore import Qt
-from datetime import datetime, timedelta
-import calendar
+from PyQt5.QtCore import Qt, QDate, QThreadPool
+from datetime import timedelta
+
+from report_engine import month_bounds
+from threads import ReportSignals, ReportTask
+
+
 class ReportController:
+    HEADERS = ["Номер", "Тип", "Цена за день", "Занят, дней", "Свободен, дней", "Загрузка", "Число клиентов", "Доход"]
+
+    # Расчёт, который ждёт пользователь, идёт раньше упреждающих (соседние месяцы)
+    PRIORITY_REQUESTED = 1
+    PRIORITY_PREFETCH = 0
+
     def __init__(self, window, client_repo, room_repo):
         self.window = window
         self.client_repo = client_repo
@@ -11,136 +21,251 @@ class ReportController:
         self.model = QStandardItemModel()
         self.window.tableView_Report.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
 
+        # Отчёты считаются в пуле потоков; готовые хранятся в памяти до изменения данных
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(2)
+        self._signals = ReportSignals()
+        self._tasks = {}    # (first_day, last_day) → ReportTask в работе
+        self._reports = {}  # (first_day, last_day) → (месячные, сводный)
+        self._generation = 0  # растёт при изменении данных: результаты старых расчётов отбрасываются
+        self._external_changes = client_repo.cache.external_changes
+        self._wanted = None  # период, отчёт за который ждёт пользователь
+        self._start_index = self.window.comboBox_MonthYear.currentIndex()
+
         self._connect_signals()
 
     def _connect_signals(self):
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._shutdown)
+
         self.window.pushButtonCreateReport.clicked.connect(self.generate_hotel_performance_report)
+        self.window.comboBox_MonthYear.currentIndexChanged.connect(self._on_start_month_changed)
+        self.window.comboBox_MonthYearEnd.currentIndexChanged.connect(lambda: self._request(self._period()))
 
-    def generate_hotel_performance_report(self):
+        # Любая запись в брони или номера делает готовые отчёты устаревшими
+        self.client_repo.signals.changed.connect(self._on_data_changed)
+        self.room_repo.signals.changed.connect(self._on_data_changed)
+
+    def _period(self, warn: bool = False):
+        """Выбранный период (first_day, last_day) или None, если он не задан или конец раньше начала."""
+        start_date = self.window.comboBox_MonthYear.currentData()
+        end_date = self.window.comboBox_MonthYearEnd.currentData()
+        if start_date is None or end_date is None or not start_date.isValid() or not end_date.isValid():
+            if warn:
+                QtWidgets.QMessageBox.warning(self.window, "Ошибка", "Выберите месяц!")
+            return None
+        if end_date < start_date:
+            if warn:
+                QtWidgets.QMessageBox.warning(self.window, "Ошибка", "Конец периода раньше начала!")
+            return None
+        first_day = month_bounds(start_date.year(), start_date.month())[0]
+        last_day = month_bounds(end_date.year(), end_date.month())[1]
+        return first_day, last_day
 
-        selected_date = self.window.comboBox_MonthYear.currentData()
-        if not selected_date.isValid():
-            QtWidgets.QMessageBox.warning(self.window, "Ошибка", "Выберите месяц!")
+    def generate_hotel_performance_report(self):
+        """
+        Отчёт за период от месяца comboBox_MonthYear до comboBox_MonthYearEnd.
+        Считается в фоне (ClientRepository.get_range_report: закрытые месяцы — из кэша);
+        для нескольких месяцев таблица содержит блок на каждый месяц и сводный блок за весь период.
+        """
+        period = self._period(warn=True)
+        if period is None:
+            return
+        if not self.room_repo.get_all():
+            QtWidgets.QMessageBox.warning(self.window, "Нет данных", "В базе нет номеров!")
             return
+        self._request(period)
 
-        year = selected_date.year()
-        month = selected_date.month()
-        days_in_month = calendar.monthrange(year, month)[1]
-        month_name = selected_date.toString("MMMM yyyy")
+    def _on_start_month_changed(self, index):
+        """Листание месяцев: в режиме одного месяца конец периода следует за началом."""
+        end_combo = self.window.comboBox_MonthYearEnd
+        if end_combo.currentIndex() in (self._start_index, -1) or end_combo.currentIndex() < index:
+            end_combo.blockSignals(True)
+            end_combo.setCurrentIndex(index)
+            end_combo.blockSignals(False)
+        self._start_index = index
+        self._request(self._period())
 
-        rooms = self.room_repo.get_all()
-        if not rooms:
-            QtWidgets.QMessageBox.warning(self.window, "Нет данных", "В базе нет номеров!")
+    # ---------- Фоновый расчёт ----------
+    def _request(self, period):
+        """
+        Показывает отчёт за period: готовый — сразу, иначе запускает расчёт.
+        Расчёт за прежде выбранный период отменяется, если он больше не нужен.
+        """
+        previous, self._wanted = self._wanted, period
+        if previous is not None and previous != period and previous not in self._neighbours(period):
+            self._cancel(previous)
+        if period is None:
             return
 
-        # Статистика по номерам
-        room_stats = {
-            r.id: {
-                "number": r.number,
-                "type": r.room_type,
-                "price": r.price,
-                "occupied_days": 0,
-                "unique_bookings": set(),
-                "nights": 0
-            } for r in rooms
-        }
-
-        # Все брони
-        bookings = self.client_repo.get_all_with_room_info()  # (id, fio, room_num, type, start, end)
-
-        first_day = datetime(year, month, 1).date()
-        last_day = datetime(year, month, days_in_month).date()
-
-        # Карта: (room_id, date) занято ли в этот день
-        occupancy_map = {}  # (room_id, date) → True
-
-        for client_id, fio, room_number, _, date_start_str, date_end_str in bookings:
-            try:
-                start = datetime.strptime(date_start_str, "%d.%m.%Y").date()
-                end = datetime.strptime(date_end_str, "%d.%m.%Y").date()
-
-                room_id = next((r.id for r in rooms if str(r.number) == str(room_number)), None)
-                if not room_id:
-                    continue
-
-                # Проверяем пересечение с месяцем
-                if end < first_day or start > last_day:
-                    continue
-
-                stay_start = max(start, first_day)
-                stay_end = min(end, last_day)  # включая день выезда
-
-                current = stay_start
-                while current <= stay_end and current.month == month:
-                    key = (room_id, current)
-                    occupancy_map[key] = True  # ← номер занят в этот день
-                    current += timedelta(days=1)
-                # Добавляем уникальную бронь по client_id (гарантированно уникально!)
-                room_stats[room_id]["unique_bookings"].add(client_id)
-
-            except ValueError:
-                continue
-
-        # === СЧИТАЕМ ДНИ И ГОСТЕЙ ===
+        self._check_external_changes()
+        result = self._reports.get(period)
+        if result is not None:
+            self._show(period, result)
+            return
+
+        if period not in self._tasks:
+            self._start(period, self.PRIORITY_REQUESTED)
+        self.window.statusbar.showMessage(f"Формируется отчёт за {self._title(period)}…")
+
+    def _start(self, period, priority: int):
+        task = ReportTask(self.client_repo, self.room_repo.get_all(), *period, self._signals)
+        task.generation = self._generation
+        self._tasks[period] = task
+        self._pool.start(task, priority)
+
+    def _cancel(self, period):
+        task = self._tasks.pop(period, None)
+        if task is not None:
+            task.cancel()
+
+    def _shutdown(self):
+        """Выход из приложения: отменяем расчёты и ждём потоки пула."""
+        for period in list(self._tasks):
+            self._cancel(period)
+        self._pool.waitForDone()
+
+    def _on_progress(self, task, done: int, total: int):
+        if task.key == self._wanted:
+            self.window.statusbar.showMessage(f"Формируется отчёт за {self._title(task.key)}: {done} из {total} мес.")
+
+    def _on_finished(self, task, result):
+        # Запись в обход приложения за время расчёта: триггеры уже сбросили кэш месяцев,
+        # и сохранять stats_rows нельзя — проверяем до сравнения поколений
+        self._check_external_changes()
+        if self._tasks.get(task.key) is task:
+            del self._tasks[task.key]
+        if task.generation != self._generation:
+            return  # посчитан по устаревшим данным
+        if task.stats_rows:
+            self.client_repo.save_monthly_stats(task.stats_rows)
+        if result is None:
+            return  # отменён: уже посчитанные месяцы сохранены в кэш
+        self._reports[task.key] = result
+        if task.key == self._wanted:
+            self._show(task.key, result)
+
+    def _on_failed(self, task, error: str):
+        if self._tasks.get(task.key) is task:
+            del self._tasks[task.key]
+        if task.key == self._wanted:
+            self.window.statusbar.clearMessage()
+            QtWidgets.QMessageBox.critical(self.window, "Ошибка", f"Не удалось сформировать отчёт:\n{error}")
+
+    def _prefetch(self, period):
+        """Упреждающе считает соседние месяцы, чтобы листание по месяцам было мгновенным."""
+        for neighbour in self._neighbours(period):
+            if neighbour not in self._reports and neighbour not in self._tasks:
+                self._start(neighbour, self.PRIORITY_PREFETCH)
+
+    @staticmethod
+    def _neighbours(period):
+        """Предыдущий и следующий месяц для отчёта за один месяц (для периода — нет)."""
+        if period is None or (period[0].year, period[0].month) != (period[1].year, period[1].month):
+            return []
+        previous = period[0] - timedelta(days=1)
+        following = period[1] + timedelta(days=1)
+        return [month_bounds(previous.year, previous.month), month_bounds(following.year, following.month)]
+
+    def _on_data_changed(self, change):
+        """Брони или номера изменились: готовые отчёты и идущие расчёты устарели."""
+        self._invalidate()
+
+    def _invalidate(self):
+        """Готовые отчёты и идущие расчёты устарели; ожидаемый пользователем отчёт считается заново."""
+        self._generation += 1
+        self._reports.clear()
+        waiting = self._wanted in self._tasks
+        for period in list(self._tasks):
+            self._cancel(period)
+        if waiting:
+            self._start(self._wanted, self.PRIORITY_REQUESTED)
+
+    def _check_external_changes(self):
+        """Файл БД изменили в обход приложения — готовые отчёты не годятся."""
+        cache = self.client_repo.cache
+        cache.check_external_changes()
+        if cache.external_changes != self._external_changes:
+            self._external_changes = cache.external_changes
+            self._invalidate()
+
+    # ---------- Вывод ----------
+    @staticmethod
+    def _title(period) -> str:
+        first = QDate(period[0].year, period[0].month, 1).toString("MMMM yyyy")
+        last = QDate(period[1].year, period[1].month, 1).toString("MMMM yyyy")
+        return first if first == last else f"{first} — {last}"
+
+    def _show(self, period, result):
+        monthly, total = result
+        title = self._title(period)
+        if len(monthly) == 1:
+            self._render([(title, total)])
+        else:
+            sections = [(self._title((report.first_day, report.last_day)), report) for report in monthly]
+            self._render(sections + [(f"весь период ({title})", total)], with_captions=True)
+
+        self.window.statusbar.showMessage(f"Отчёт по номерам за {title} готов!", 8000)
+        self._prefetch(period)
+
+    def _render(self, sections, with_captions: bool = False):
+        """
+        Выводит готовые Report в tableView_Report; сам ничего не считает.
+        sections — [(подпись периода, Report)]: строки номеров и строка «ИТОГО» на каждый.
+        """
+        view = self.window.tableView_Report
         model = QStandardItemModel()
-        model.setHorizontalHeaderLabels([
-            "Номер", "Тип", "Цена за день", "Занят, дней", "Свободен, дней", "Загрузка", "Число клиентов", "Доход"
-        ])
-        self.window.tableView_Report.setModel(model)
-
-        total_income = total_occupied_days = total_guests = 0
-
-        for room_id, s in room_stats.items():
-            # Считаем, сколько уникальных дней был занят номер
-            occupied_days = sum(1 for (rid, date) in occupancy_map.keys() if rid == room_id)
-            free_days = days_in_month - occupied_days
-            load = round(occupied_days / days_in_month * 100, 1) if days_in_month else 0
-
-            guests = len(s["unique_bookings"])
-            nights = occupied_days
-            income = nights * s["price"]
-            total_income += income
-            total_occupied_days += occupied_days
-            total_guests += guests
-
-            row = [
-                QStandardItem(str(s["number"])),
-                QStandardItem(s["type"]),
-                QStandardItem(f"{s['price']:,} ₽".replace(",", " ")),
-                QStandardItem(str(occupied_days)),
-                QStandardItem(str(free_days)),
-                QStandardItem(f"{load}%"),
-                QStandardItem(str(guests)),
-                QStandardItem(f"{income:,} ₽".replace(",", " "))
-            ]
-
-            # Цвет загрузки
-            color = "#d4edda" if load >= 90 else "#fff3cd" if load >= 70 else "#f8d7da"
-            row[5].setBackground(QBrush(QColor(color)))
-            row[7].setFont(QFont("Segoe UI", 10, QFont.Bold))
-            for item in row:
-                item.setTextAlignment(Qt.AlignCenter)
-
-            model.appendRow(row)
-
-        # === ИТОГО ===
-        avg_load = round(total_occupied_days / (len(rooms) * days_in_month) * 100, 1) if rooms else 0
-
-        summary_text = (
-            f"ИТОГО за {month_name}: "
-            f"Номеров: {len(rooms)} │ "
-            f"Доход {total_income:,} ₽ │ "
-            f"Число клиентов: {total_guests} │ "
-            f"Средняя загрузка: {avg_load}%"
-        ).replace(",", " ")
-
-        summary = QStandardItem(summary_text)
-        summary.setBackground(QBrush(QColor("#0078d7")))
-        summary.setForeground(QBrush(QColor("white")))
-        summary.setFont(QFont("Segoe UI", 12, QFont.Bold))
-        summary.setTextAlignment(Qt.AlignCenter)
-
-        model.appendRow([summary] + [QStandardItem("") for _ in range(7)])
-        self.window.tableView_Report.setSpan(model.rowCount() - 1, 0, 1, 8)
-
-        self.window.statusbar.showMessage(f"Отчёт по номерам за {month_name} готов!", 8000)
+        model.setHorizontalHeaderLabels(self.HEADERS)
+        view.setModel(model)
+        view.clearSpans()
+
+        for caption, report in sections:
+            if with_captions:
+                self._append_span_row(model, caption[:1].upper() + caption[1:], "#e3f2fd", "#0078d7", 11)
+            for stats in report.rooms:
+                model.appendRow(self._room_row(stats))
+
+            summary_text = (
+                f"ИТОГО за {caption}: "
+                f"Номеров: {len(report.rooms)} │ "
+                f"Доход {report.income:,} ₽ │ "
+                f"Число клиентов: {report.guests} │ "
+                f"Средняя загрузка: {report.load}%"
+            ).replace(",", " ")
+            self._append_span_row(model, summary_text, "#0078d7", "white", 12)
+
+    @staticmethod
+    def _room_row(stats):
+        room = stats.room
+        load = stats.load
+        row = [
+            QStandardItem(str(room.number)),
+            QStandardItem(room.room_type),
+            QStandardItem(f"{room.price:,} ₽".replace(",", " ")),
+            QStandardItem(str(stats.occupied_days)),
+            QStandardItem(str(stats.free_days)),
+            QStandardItem(f"{load}%"),
+            QStandardItem(str(stats.guests)),
+            QStandardItem(f"{stats.income:,} ₽".replace(",", " "))
+        ]
+
+        # Цвет загрузки
+        color = "#d4edda" if load >= 90 else "#fff3cd" if load >= 70 else "#f8d7da"
+        row[5].setBackground(QBrush(QColor(color)))
+        row[7].setFont(QFont("Segoe UI", 10, QFont.Bold))
+        for item in row:
+            item.setTextAlignment(Qt.AlignCenter)
+        return row
+
+    def _append_span_row(self, model, text: str, background: str, foreground: str, font_size: int):
+        """Строка на всю ширину таблицы: подпись месяца или «ИТОГО»."""
+        item = QStandardItem(text)
+        item.setBackground(QBrush(QColor(background)))
+        item.setForeground(QBrush(QColor(foreground)))
+        item.setFont(QFont("Segoe UI", font_size, QFont.Bold))
+        item.setTextAlignment(Qt.AlignCenter)
+
+        model.appendRow([item] + [QStandardItem("") for _ in range(len(self.HEADERS) - 1)])
+        self.window.tableView_Report.setSpan(model.rowCount() - 1, 0, 1, len(self.HEADERS))
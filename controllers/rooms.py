@@ -1,13 +1,22 @@
-from PyQt5 import QtWidgets, QtCore, QtGui
+from PyQt5 import QtWidgets
 from dialogs import AddRoomDialog
+from table_models import RoomTableModel, RoomFilterProxyModel
 
 
 class RoomController:
-    def __init__(self, window, table_widget, repo):
+    def __init__(self, window, table_view, repo):
         self.window = window
-        self.table = table_widget
+        self.table = table_view
         self.repo = repo
-        self.rooms_cache = self.repo.get_all()
+
+        # Исходная модель со всеми номерами + прокси с фильтрами вкладки
+        self.model = RoomTableModel(self.repo.get_all_room_statuses)
+        self.proxy = RoomFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+        self.table.setModel(self.proxy)
+        self.table.setColumnHidden(RoomTableModel.ID_COLUMN, True)
+        self.table.setColumnWidth(RoomTableModel.STATUS_COLUMN, 280)
+
         self._connect_signals()
         self.load_rooms()
 
@@ -18,48 +27,27 @@ class RoomController:
         self.window.comboBoxCapacityRooms.currentTextChanged.connect(self.search_rooms)
         self.window.comboBoxRoomType.currentTextChanged.connect(self.search_rooms)
         self.window.comboBox_StatusRooms.currentTextChanged.connect(self.search_rooms)
+        self.repo.signals.changed.connect(self._on_rooms_changed)
 
-    def _fill_rooms_table(self, rooms):
-        self.table.setRowCount(0)
-
-        # Получаем статусы всех комнат сразу
-        room_statuses = self.repo.get_all_room_statuses()  # {room_id: (status, status_text, color)}
-
-        for room in rooms:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            # Берём статус из словаря
-            status, status_text, color = room_statuses.get(room.id, ("free", "Свободен", "#28a745"))
-
-            # Заполняем таблицу
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(room.number)))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(room.room_type))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(str(room.capacity)))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"{room.price} ₽"))
-
-            status_item = QtWidgets.QTableWidgetItem(status_text)
-            status_item.setForeground(QtGui.QBrush(QtGui.QColor(color)))
-            status_item.setTextAlignment(QtCore.Qt.AlignCenter)
-            status_item.setFont(QtGui.QFont("Segoe UI", 10, QtGui.QFont.Bold))
-            self.table.setItem(row, 4, status_item)
+    def _on_rooms_changed(self, change):
+        """Правит только затронутые строки (ChangeSet от RoomRepository, в т.ч. смена статуса при заселении)."""
+        if change.reset:
+            self.load_rooms()
+            return
 
-            id_item = QtWidgets.QTableWidgetItem(str(room.id))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row, 5, id_item)
+        for room_id in change.deleted:
+            self.model.remove_room(room_id)
+        for room in change.updated + change.inserted:
+            self.model.upsert_room(room)
+        self.model.refresh_statuses([room.id for room in change.updated])
 
-        self.table.setColumnWidth(4, 280)
+    def _selected_rooms(self):
+        """Выбранные номера (Room) — строки прокси переводятся в строки исходной модели."""
+        rows = {index.row() for index in self.table.selectionModel().selectedIndexes()}
+        return [self.model.room(self.proxy.mapToSource(self.proxy.index(row, 0)).row()) for row in sorted(rows)]
 
-    def update_room_combobox(self):
-        self.window.comboRoomSearch.clear()
-        self.window.comboRoomSearch.addItem("Все номера", None)
-        for room in self.rooms_cache:
-            text = f"{room.number} — {room.room_type} ({room.capacity} чел.)"
-            self.window.comboRoomSearch.addItem(text, room.id)
     def load_rooms(self):
-        self.rooms_cache = self.repo.get_all()  # обновляем кэш
-        self._fill_rooms_table(self.rooms_cache)  # заполняем таблицу
-        self.update_room_combobox()
+        self.model.set_rooms(self.repo.get_all())
 
     def add_room(self):
         dialog = AddRoomDialog(self.window)
@@ -75,7 +63,6 @@ class RoomController:
                 capacity=data["capacity"],
                 price=data["price"]
             )
-            self.load_rooms()
             QtWidgets.QMessageBox.information(
                 self.window,
                 "Успех",
@@ -90,18 +77,19 @@ class RoomController:
             )
 
     def edit_room(self):
-        row = self.table.currentRow()
-        if row < 0:
+        current = self.table.currentIndex()
+        if not current.isValid():
             QtWidgets.QMessageBox.warning(self.window, "Ошибка", "Выберите номер!")
             return
-        room_id = int(self.table.item(row, 5).text())
+        room = self.model.room(self.proxy.mapToSource(current).row())
+        room_id = room.id
 
         dialog = AddRoomDialog(self.window)
         dialog.setWindowTitle("Редактировать номер")
-        dialog.spinNumber.setValue(int(self.table.item(row, 0).text()))
-        dialog.comboType.setCurrentText(self.table.item(row, 1).text())
-        dialog.spinCapacity.setValue(int(self.table.item(row, 2).text()))
-        dialog.spinPrice.setValue(int(self.table.item(row, 3).text().replace(" ₽", "")))
+        dialog.spinNumber.setValue(room.number)
+        dialog.comboType.setCurrentText(room.room_type)
+        dialog.spinCapacity.setValue(room.capacity)
+        dialog.spinPrice.setValue(room.price)
 
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             data = dialog.get_data()
@@ -113,9 +101,6 @@ class RoomController:
                     capacity=data["capacity"],
                     price=data["price"]
                 )
-                self.load_rooms()
-                self.window.clients_ctrl.load_clients_from_db()
-
                 QtWidgets.QMessageBox.information(
                     self.window,
                     "Успех",
@@ -131,12 +116,9 @@ class RoomController:
                 )
 
     def remove_room(self):
-        selected_rows = sorted(
-            set(index.row() for index in self.table.selectedIndexes()),
-            reverse=True
-        )
+        selected_rooms = self._selected_rooms()
 
-        if not selected_rows:
+        if not selected_rooms:
             QtWidgets.QMessageBox.warning(
                 self.window,
                 "Удаление",
@@ -144,7 +126,7 @@ class RoomController:
             )
             return
 
-        count = len(selected_rows)
+        count = len(selected_rooms)
 
         # Красивое сообщение
         if count == 1:
@@ -165,21 +147,17 @@ class RoomController:
         if msg.clickedButton() != btn_yes:
             return
 
-        deleted_count = 0
-        for row in selected_rows:
-            id_item = self.table.item(row, 5)  # колонка 5 — скрытая с ID
-            if id_item:
-                room_id = int(id_item.text())
-                try:
-                    self.repo.delete(room_id)
-                    deleted_count += 1
-                except ValueError as e:
-                    QtWidgets.QMessageBox.warning(self.window, "Ошибка удаления", str(e))
-                except Exception as e:
-                    QtWidgets.QMessageBox.warning(f"Ошибка удаления номера ID {room_id}: {e}")
-
-        # Обновляем таблицу
-        self.load_rooms()
+        numbers = {room.id: str(room.number) for room in selected_rooms}
+
+        try:
+            results = self.repo.delete_many(list(numbers))
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self.window, "Ошибка удаления", str(e))
+            return
+
+        deleted_count = sum(1 for error in results.values() if error is None)
+        blocked = [numbers[room_id] for room_id, error in results.items() if error == self.repo.ROOM_HAS_CLIENTS]
+        missing = [numbers[room_id] for room_id, error in results.items() if error == self.repo.ROOM_NOT_FOUND]
 
         # Сообщение об успехе
         if deleted_count == count:
@@ -189,59 +167,23 @@ class RoomController:
                 f"Удалено номеров: {deleted_count}"
             )
         else:
+            details = []
+            if blocked:
+                details.append(f"В номерах есть клиенты: {', '.join(blocked)}")
+            if missing:
+                details.append(f"Уже удалены: {', '.join(missing)}")
             QtWidgets.QMessageBox.warning(
                 self.window,
                 "Частичное удаление",
-                f"Удалено: {deleted_count} из {count}\n"
-                "Проверьте, не заняты ли номера клиентами."
+                f"Удалено: {deleted_count} из {count}\n" + "\n".join(details)
             )
 
     def search_rooms(self):
-        capacity = self.window.comboBoxCapacityRooms.currentText()
-        room_type = self.window.comboBoxRoomType.currentText()
-        status_filter = self.window.comboBox_StatusRooms.currentText()
-
-        rooms = self.rooms_cache
-        room_statuses = self.repo.get_all_room_statuses()
-
-        if capacity != "Все":
-            if capacity == "5+":
-                rooms = [r for r in rooms if r.capacity >= 5]
-            else:
-                rooms = [r for r in rooms if r.capacity == int(capacity)]
-
-            # Фильтруем по типу
-        if room_type != "Все":
-            rooms = [r for r in rooms if r.room_type == room_type]
-
-            # Фильтруем по статусу
-        if status_filter != "Все":
-            if status_filter == "Свободен":
-                rooms = [r for r in rooms if room_statuses[r.id][0] == "free"]
-            elif status_filter == "Занят":
-                rooms = [r for r in rooms if room_statuses[r.id][0] == "busy"]
-        # Очищаем таблицу
-        self.table.setRowCount(0)
-
-        for room in rooms:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            room_status, status_text, color = room_statuses[room.id]
-            # Заполняем таблицу
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(room.number)))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(room.room_type))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(str(room.capacity)))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"{room.price} ₽"))
-
-            status_item = QtWidgets.QTableWidgetItem(status_text)
-            status_item.setForeground(QtGui.QBrush(QtGui.QColor(color)))
-            status_item.setTextAlignment(QtCore.Qt.AlignCenter)
-            status_item.setFont(QtGui.QFont("Segoe UI", 10, QtGui.QFont.Bold))
-            self.table.setItem(row, 4, status_item)
-
-            id_item = QtWidgets.QTableWidgetItem(str(room.id))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row, 5, id_item)
-
-        self.table.setColumnWidth(4, 280)
-
+        # Статусы могли измениться в обход приложения или со сменой дня: снимок модели
+        # сбрасываем, свежие отдаст кэш репозитория (день + PRAGMA data_version)
+        self.model.refresh_statuses()
+        self.proxy.set_filters(
+            self.window.comboBoxCapacityRooms.currentText(),
+            self.window.comboBoxRoomType.currentText(),
+            self.window.comboBox_StatusRooms.currentText()
+        )
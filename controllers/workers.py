@@ -1,6 +1,9 @@
 
+import bisect
+
 from PyQt5 import QtWidgets, QtCore
 from dialogs import WorkerDialog
+from worker_index import worker_matches
 
 
 class WorkerController:
@@ -11,6 +14,7 @@ class WorkerController:
         self.window = window
         self.table = table_widget
         self.db = db
+        self._id_items = {}  # worker_id → ячейка скрытой колонки ID
 
         # Настраиваем таблицу: 5 колонок, последняя — скрытая для ID
         self.table.setColumnCount(5)
@@ -31,6 +35,9 @@ class WorkerController:
         self.window.lineEdit_Worker.textChanged.connect(self.search_workers)        # должность
         self.window.lineEdit_WorkerContact.textChanged.connect(self.search_workers)  # контакты
 
+        # Точечные обновления таблицы после записи в БД
+        self.db.signals.changed.connect(self._on_workers_changed)
+
     # =================== Добавление сотрудника ===================
     def add_worker(self):
         dialog = WorkerDialog(self.window)
@@ -53,7 +60,6 @@ class WorkerController:
             schedule=data["schedule"] or "Пн-Пт 9:00-18:00"
         )
 
-        self.load_workers()
         QtWidgets.QMessageBox.information(self.window, "Успех", "Сотрудник добавлен!")
 
     # =================== Редактирование сотрудника ===================
@@ -93,7 +99,6 @@ class WorkerController:
             schedule=new_data["schedule"] or "Пн-Пт 9:00-18:00"
         )
 
-        self.load_workers()
         QtWidgets.QMessageBox.information(self.window, "Успех", "Данные сотрудника обновлены!")
 
     # =================== Удаление сотрудника ===================
@@ -125,19 +130,19 @@ class WorkerController:
         if msg.clickedButton() != btn_yes:
             return
 
-        deleted_count = 0
-        for row in selected_rows:
-            id_item = self.table.item(row, 4)
-            if id_item:
-                worker_id = int(id_item.text())
-                try:
-                    self.db.delete(worker_id)
-                    deleted_count += 1
-                except Exception as e:
-                    QtWidgets.QMessageBox.warning(f"Ошибка при удалении ID {worker_id}: {e}")
+        worker_ids = [
+            int(self.table.item(row, 4).text())
+            for row in selected_rows
+            if self.table.item(row, 4)
+        ]
 
+        try:
+            results = self.db.delete_many(worker_ids)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self.window, "Ошибка удаления", str(e))
+            return
 
-        self.load_workers()
+        deleted_count = sum(1 for deleted in results.values() if deleted)
 
         # Красивое сообщение об успехе
         if deleted_count == count:
@@ -155,55 +160,69 @@ class WorkerController:
             )
 
     # =================== Поиск ===================
-    def search_workers(self):
-        search_fio = self.window.lineEdit_FIOWorker.text().strip().lower()
-        search_position = self.window.lineEdit_Worker.text().strip()
-        search_contacts = self.window.lineEdit_WorkerContact.text().strip()
-
-        all_workers = self.db.get_all()
+    def _filters(self):
+        return (
+            self.window.lineEdit_FIOWorker.text(),
+            self.window.lineEdit_Worker.text(),         # должность
+            self.window.lineEdit_WorkerContact.text(),  # контакты
+        )
 
-        results = []
-        for worker in all_workers:
-            fio_match = not search_fio or search_fio in worker.fio.lower()
-            pos_match = not search_position or search_position.lower() in worker.position.lower()
-            cont_match = not search_contacts or search_contacts in (worker.contacts or "").lower()
+    def _worker_matches(self, worker):
+        return worker_matches(worker, *self._filters())
 
-            if fio_match and pos_match and cont_match:
-                results.append(worker)
+    def search_workers(self):
+        # поиск по индексу в памяти (триграммы всех трёх полей), без запроса к БД
+        results = self.db.search(*self._filters())
+        self._fill_workers_table(results)
+        self.window.statusbar.showMessage(f"Найдено сотрудников: {len(results)}", 3000)
 
+    def _fill_workers_table(self, workers):
         self.table.setRowCount(0)
-        for worker in results:
+        self._id_items.clear()
+        for worker in workers:
             row = self.table.rowCount()
             self.table.insertRow(row)
+            self._set_worker_row(row, worker)
+
+    def _set_worker_row(self, row, worker):
+        self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(worker.fio))
+        self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(worker.contacts or "—"))
+        self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(worker.schedule))
+        self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(worker.position))
+
+        id_item = QtWidgets.QTableWidgetItem(str(worker.id))
+        id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
+        self.table.setItem(row, 4, id_item)
+        self._id_items[worker.id] = id_item
+
+    def _remove_worker_row(self, worker_id):
+        id_item = self._id_items.pop(worker_id, None)
+        if id_item is not None:
+            self.table.removeRow(id_item.row())
+
+    def _on_workers_changed(self, change):
+        """Правит только затронутые строки (ChangeSet от WorkerRepository)."""
+        if change.reset:
+            self.load_workers()
+            return
 
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(worker.fio))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(worker.contacts or "—"))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(worker.schedule))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(worker.position))
-
-            id_item = QtWidgets.QTableWidgetItem(str(worker.id))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row, 4, id_item)
+        for worker_id in change.deleted:
+            self._remove_worker_row(worker_id)
 
-        self.window.statusbar.showMessage(f"Найдено сотрудников: {len(results)}", 3000)
+        for worker in change.updated + change.inserted:
+            self._remove_worker_row(worker.id)
+            if self._worker_matches(worker):
+                # Строки отсортированы по ФИО (как ORDER BY fio в БД)
+                row = bisect.bisect_right(
+                    range(self.table.rowCount()), worker.fio,
+                    key=lambda r: self.table.item(r, 0).text()
+                )
+                self.table.insertRow(row)
+                self._set_worker_row(row, worker)
 
     # =================== Загрузка всех ===================
     def load_workers(self):
         """Загружает всех сотрудников из БД"""
-        self.table.setRowCount(0)
         workers = self.db.get_all()
-
-        for worker in workers:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(worker.fio))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(worker.contacts or "—"))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(worker.schedule))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(worker.position))
-
-            id_item = QtWidgets.QTableWidgetItem(str(worker.id))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row, 4, id_item)
-
-        self.window.statusbar.showMessage(f"Загружено сотрудников: {len(workers)}", 2000)
\ No newline at end of file
+        self._fill_workers_table(workers)
+        self.window.statusbar.showMessage(f"Загружено сотрудников: {len(workers)}", 2000)
@@ -2,44 +2,564 @@ import sqlite3
 import bcrypt
 from PyQt5 import QtCore
 import csv
-from datetime import datetime
+from datetime import date, datetime
 import calendar
+import threading
+
+from booking_index import BookingIndex
+from worker_index import WorkerIndex
+from report_engine import Report, RoomStats, build_reports, period_bounds, rollup
+from models import Room, Worker, Booking, ChangeSet
+
+
+class ConnectionManager:
+    """
+    Держит одно долгоживущее соединение с SQLite на каждый поток (и файл БД).
+
+    Соединение открывается при первом обращении из потока, сразу получает
+    настроенные PRAGMA и дальше переиспользуется всеми репозиториями —
+    без повторного открытия файла и разбора схемы на каждый запрос.
+    Подготовленные выражения кэширует сам модуль sqlite3 (cached_statements).
+    """
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",      # ~16 МБ страничного кэша
+        "PRAGMA mmap_size = 268435456",    # 256 МБ memory-mapped I/O
+        "PRAGMA temp_store = MEMORY",
+    )
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, db_path: str) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, cached_statements=self.STATEMENT_CACHE_SIZE)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            connections[db_path] = conn
+        return conn
+
+    def close(self):
+        """Закрывает все соединения текущего потока."""
+        connections = getattr(self._local, "connections", None) or {}
+        for conn in connections.values():
+            conn.close()
+        connections.clear()
+
+
+connection_manager = ConnectionManager()
+
 
 def _connect(db_path: str = "hotel5.db"):
-    return sqlite3.connect(db_path)
+    return connection_manager.get(db_path)
+
+
+class QueryCache:
+    """
+    Общий для всех репозиториев кэш результатов чтения одного файла БД.
+
+    Сбрасывается:
+      * явно — после каждой записи через репозитории (invalidate);
+      * сам — когда PRAGMA data_version показывает, что файл изменило другое
+        соединение (другой процесс или другой поток). Такие сбросы считаются
+        в external_changes, чтобы зависимые структуры (индекс броней) тоже
+        перечитывались.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._results = {}
+        self._local = threading.local()  # data_version, увиденный соединением потока
+        self.hits = 0
+        self.misses = 0
+        self.external_changes = 0
+
+    def get(self, key, loader):
+        """Возвращает закэшированный результат по key или вызывает loader()."""
+        self.check_external_changes()
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        self.misses += 1
+        value = self._results[key] = loader()
+        return value
+
+    def check_external_changes(self):
+        version = _connect(self.db_path).execute("PRAGMA data_version").fetchone()[0]
+        seen = getattr(self._local, "data_version", None)
+        self._local.data_version = version
+        if seen is not None and seen != version:
+            self._results.clear()
+            self.external_changes += 1
+
+    def invalidate(self):
+        self._results.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+
+_caches = {}
+
+
+def query_cache(db_path: str = "hotel5.db") -> QueryCache:
+    """Кэш чтения для файла БД (один на файл, общий для всех репозиториев)."""
+    cache = _caches.get(db_path)
+    if cache is None:
+        cache = _caches[db_path] = QueryCache(db_path)
+    return cache
+
+
+class RepositorySignals(QtCore.QObject):
+    """
+    Сигналы репозитория. changed(ChangeSet) испускается после каждой записи,
+    чтобы контроллеры обновляли только затронутые строки, а не всю таблицу.
+    """
+    changed = QtCore.pyqtSignal(object)  # ChangeSet
+
+
+# Не больше стольких параметров в одном "IN (?, ?, ...)" (лимит SQLite — 32766)
+_IN_CHUNK = 500
+
+
+def _chunked(items: list, size: int = _IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+def _select_by_ids(conn, sql: str, ids) -> list:
+    """Выполняет sql с "IN ({ids})" пачками по _IN_CHUNK id и собирает все строки."""
+    ids = list(ids)
+    rows = []
+    for chunk in _chunked(ids):
+        rows += conn.execute(sql.format(ids=_placeholders(len(chunk))), chunk).fetchall()
+    return rows
+
+
+def _to_iso(date_str: str) -> str:
+    """'15.03.2025' → '2025-03-15' (формат хранения дат в БД)"""
+    return f"{date_str[6:10]}-{date_str[3:5]}-{date_str[0:2]}"
+
+
+def _from_iso(iso_str: str) -> str:
+    """'2025-03-15' → '15.03.2025' (формат дат в интерфейсе и CSV)"""
+    return f"{iso_str[8:10]}.{iso_str[5:7]}.{iso_str[0:4]}"
+
+
+def _parse_stored_date(text: str) -> str:
+    """Дата брони из БД ('гггг-мм-дд' или 'д.м.гггг', в т. ч. без ведущих нулей) → ISO 'гггг-мм-дд'."""
+    text = (text or "").strip()
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return datetime.strptime(text, "%d.%m.%Y").date().isoformat()
+
+
+def _migrate_dates_to_iso(conn):
+    """
+    Переводит даты броней в сортируемый ISO 'гггг-мм-дд'.
+
+    Каждая дата разбирается в Python (strptime): старый импорт CSV сохранял
+    строку как есть, и кроме 'дд.мм.гггг' в базе встречаются '1.2.2025'.
+    Если хоть одну дату разобрать нельзя, миграция прерывается ValueError
+    со списком броней — транзакция откатывается, версия схемы не растёт,
+    и смешанных форматов в базе не остаётся.
+    """
+    updates = []
+    bad = []
+    for client_id, date_start, date_end in conn.execute("SELECT id, date_start, date_end FROM clients").fetchall():
+        try:
+            start, end = _parse_stored_date(date_start), _parse_stored_date(date_end)
+        except ValueError:
+            bad.append(f"id {client_id}: {date_start!r} — {date_end!r}")
+            continue
+        if (start, end) != (date_start, date_end):
+            updates.append((start, end, client_id))
+
+    if bad:
+        shown = "; ".join(bad[:20]) + (f" и ещё {len(bad) - 20}" if len(bad) > 20 else "")
+        raise ValueError(f"Не удалось разобрать даты броней (нужен ДД.ММ.ГГГГ), исправьте их в clients: {shown}")
+    conn.executemany("UPDATE clients SET date_start = ?, date_end = ? WHERE id = ?", updates)
+
+
+def _create_booking_indexes(conn):
+    """Индексы под проверки занятости, отчёты и статусы номеров."""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_clients_room_dates
+        ON clients (room_id, date_start, date_end)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clients_date_start ON clients (date_start)")
+
+
+def fio_key(fio: str) -> str:
+    """Нормализованное ФИО для поиска дублей: без лишних пробелов, без регистра, ё → е."""
+    return " ".join(fio.split()).casefold().replace("ё", "е")
+
+
+def _add_worker_fio_key(conn):
+    """Колонка workers.fio_key с индексом — проверка дублей при импорте без полного сканирования."""
+    conn.execute("ALTER TABLE workers ADD COLUMN fio_key TEXT")
+    conn.executemany(
+        "UPDATE workers SET fio_key = ? WHERE id = ?",
+        [(fio_key(fio), worker_id) for worker_id, fio in conn.execute("SELECT id, fio FROM workers").fetchall()]
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_workers_fio_key ON workers (fio_key)")
+
+
+def _create_clients_fts(conn):
+    """
+    Полнотекстовый индекс ФИО гостей: FTS5 с токенизатором trigram (поиск по
+    подстроке без учёта регистра). Таблица external content — хранит только
+    индекс, сами ФИО остаются в clients; синхронизацию держат триггеры.
+    Если SQLite собран без FTS5/trigram (старше 3.34), индекс не создаётся
+    и поиск работает по-старому; ClientRepository повторяет попытку при каждом
+    запуске, так что после обновления SQLite индекс появится сам.
+    """
+    if _has_table(conn, "clients_fts"):
+        return
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE clients_fts USING fts5(
+                fio, content='clients', content_rowid='id', tokenize='trigram case_sensitive 0'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    conn.execute("""
+        CREATE TRIGGER clients_fts_insert AFTER INSERT ON clients BEGIN
+            INSERT INTO clients_fts (rowid, fio) VALUES (new.id, new.fio);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER clients_fts_delete AFTER DELETE ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, fio) VALUES ('delete', old.id, old.fio);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER clients_fts_update AFTER UPDATE OF fio ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, fio) VALUES ('delete', old.id, old.fio);
+            INSERT INTO clients_fts (rowid, fio) VALUES (new.id, new.fio);
+        END
+    """)
+    conn.execute("INSERT INTO clients_fts (clients_fts) VALUES ('rebuild')")
+
+
+def _create_status_index(conn):
+    """
+    Покрывающий индекс под статусы номеров: брони, которые заканчиваются
+    сегодня или позже (текущие и будущие), читаются диапазоном по date_end.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clients_date_end ON clients (date_end, room_id, date_start)")
+
+
+# Месяц брони для триггеров monthly_room_stats: 'гггг-мм-дд' → (год, месяц)
+_SQL_MONTH_OF = "(CAST(substr({date}, 1, 4) AS INTEGER), CAST(substr({date}, 6, 2) AS INTEGER))"
+
+
+def _create_monthly_room_stats(conn):
+    """
+    Постоянный кэш отчётов за закрытые месяцы: занятые дни, гости и переходящие
+    из прошлого месяца брони (RoomStats.carried_in) по номерам.
+    Триггеры на clients удаляют строки месяцев, которых касается добавленная,
+    изменённая или удалённая бронь (от месяца заезда до месяца выезда) —
+    в том числе при записи в обход репозиториев.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_room_stats (
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            occupied_days INTEGER NOT NULL,
+            guests INTEGER NOT NULL,
+            carried_in INTEGER NOT NULL,
+            PRIMARY KEY (year, month, room_id)
+        ) WITHOUT ROWID
+    """)
+    invalidate = "DELETE FROM monthly_room_stats WHERE (year, month) BETWEEN {start} AND {end};"
+    new = invalidate.format(start=_SQL_MONTH_OF.format(date="new.date_start"),
+                            end=_SQL_MONTH_OF.format(date="new.date_end"))
+    old = invalidate.format(start=_SQL_MONTH_OF.format(date="old.date_start"),
+                            end=_SQL_MONTH_OF.format(date="old.date_end"))
+    conn.execute(f"CREATE TRIGGER monthly_room_stats_insert AFTER INSERT ON clients BEGIN {new} END")
+    conn.execute(f"CREATE TRIGGER monthly_room_stats_delete AFTER DELETE ON clients BEGIN {old} END")
+    conn.execute(f"""
+        CREATE TRIGGER monthly_room_stats_update AFTER UPDATE OF room_id, date_start, date_end ON clients
+        BEGIN {old} {new} END
+    """)
+
+
+# Базовые таблицы. Создаются все сразу перед миграциями (_migrate), так что схема
+# не зависит от того, какие репозитории и в каком порядке созданы.
+_SQL_CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS rooms (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        number INTEGER UNIQUE NOT NULL,
+        room_type TEXT NOT NULL,
+        capacity INTEGER NOT NULL,
+        price INTEGER NOT NULL,
+        status TEXT DEFAULT 'free'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clients (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fio TEXT NOT NULL,
+        room_id INTEGER NOT NULL,
+        date_start TEXT NOT NULL,
+        date_end TEXT NOT NULL,
+        FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE RESTRICT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fio TEXT NOT NULL,
+        position TEXT NOT NULL,
+        contacts TEXT,
+        schedule TEXT DEFAULT 'Пн-Пт 9:00-18:00'
+    )
+    """,
+)
+
+
+# Версионированные миграции схемы; номер миграции = позиция в списке,
+# применённая версия хранится в PRAGMA user_version.
+_MIGRATIONS = [
+    _migrate_dates_to_iso,
+    _create_booking_indexes,
+    _add_worker_fio_key,
+    _create_clients_fts,
+    _create_status_index,
+    _create_monthly_room_stats,
+    # повтор первой миграции: её прежняя версия на SQL пропускала даты вида '1.2.2025'
+    _migrate_dates_to_iso,
+]
+
+
+def _migrate(conn):
+    """
+    Создаёт недостающие базовые таблицы (_SQL_CREATE_TABLES) и применяет
+    недостающие миграции по порядку, каждую — в своей транзакции.
+    """
+    with conn:
+        for sql in _SQL_CREATE_TABLES:
+            conn.execute(sql)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in enumerate(_MIGRATIONS, start=1):
+        if target <= version:
+            continue
+        with conn:
+            conn.execute("BEGIN")
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+
+
+# --- Горячие запросы по броням ---
+# Вынесены в константы, чтобы их планы проверялись find_full_scans():
+# все они обязаны идти по индексу, а не полным сканированием таблицы.
+
+_SQL_CLIENT_ROOM = "SELECT room_id FROM clients WHERE id = ?"
+
+_SQL_CLIENTS_ROOMS = "SELECT id, room_id FROM clients WHERE id IN ({ids})"
+
+_SQL_BOOKINGS_BY_IDS = """
+    SELECT c.id, c.fio, r.number, r.room_type, c.date_start, c.date_end, r.id AS room_id
+    FROM clients c
+    JOIN rooms r ON c.room_id = r.id
+    WHERE c.id IN ({ids})
+"""
+
+_SQL_ROOMS_WITH_CLIENTS = "SELECT DISTINCT room_id FROM clients WHERE room_id IN ({ids})"
+
+_SQL_ROOM_OVERLAP = """
+    SELECT 1 FROM clients
+    WHERE room_id = ?
+      AND date_start <= ?    -- существующая бронь начинается до конца новой
+      AND date_end >= ?      -- и заканчивается после начала новой
+    LIMIT 1
+"""
+
+_SQL_REFRESH_STATUSES = """
+    UPDATE rooms
+    SET status = CASE WHEN EXISTS (
+            SELECT 1 FROM clients
+            WHERE clients.room_id = rooms.id
+              AND date_start <= ?
+              AND date_end >= ?
+        ) THEN 'busy' ELSE 'free' END
+    WHERE id IN ({ids})
+"""
+
+_SQL_ROOM_MONTH_BOOKINGS = """
+    SELECT date_start, date_end FROM clients
+    WHERE room_id = ?
+      AND date_start <= ?
+      AND date_end >= ?
+"""
+
+_SQL_MONTH_BOOKINGS = """
+    SELECT r.room_type, c.date_start, c.date_end, r.price
+    FROM clients c
+    JOIN rooms r ON c.room_id = r.id
+    WHERE c.date_start <= ? AND c.date_end >= ?
+"""
+
+# Брони, пересекающие период: для отчётов (report_engine).
+# Дни сразу как date.toordinal(): julianday('0001-01-01') = 1721425.5
+_SQL_BOOKING_INTERVALS = """
+    SELECT id, room_id,
+           CAST(julianday(date_start) - 1721424.5 AS INTEGER),
+           CAST(julianday(date_end) - 1721424.5 AS INTEGER)
+    FROM clients
+    WHERE date_start <= ? AND date_end >= ?
+"""
+
+# Кэш отчётов за закрытые месяцы, диапазон (год, месяц) — по первичному ключу
+_SQL_MONTHLY_STATS = """
+    SELECT year, month, room_id, occupied_days, guests, carried_in FROM monthly_room_stats
+    WHERE (year, month) BETWEEN (?, ?) AND (?, ?)
+"""
+
+# Статусы всех номеров одним проходом по idx_clients_date_end: только брони, не
+# закончившиеся к ?1 (будущие тоже — у них date_end >= date_start > ?1).
+# По номеру: конец текущего проживания и ближайший заезд.
+# +room_id не даёт планировщику группировать по idx_clients_room_dates — это полный проход.
+_SQL_ROOM_STATUSES = """
+    SELECT room_id,
+           MAX(CASE WHEN date_start <= ?1 THEN date_end END),
+           MIN(CASE WHEN date_start > ?1 THEN date_start END)
+    FROM clients
+    WHERE date_end >= ?1
+    GROUP BY +room_id
+"""
+
+# Поиск клиентов по индексу clients_fts: MATCH по фразе в кавычках — это поиск
+# подстроки (trigram), фильтр по номеру комнаты — в том же запросе.
+# CROSS JOIN фиксирует порядок: сначала совпадения из индекса, потом их строки
+# (иначе планировщик идёт по броням номера и делает MATCH на каждую).
+_SQL_SEARCH_CLIENTS_FTS = """
+    SELECT c.id, c.fio, c.room_id, c.date_start, c.date_end
+    FROM clients_fts f
+    CROSS JOIN clients c ON c.id = f.rowid
+    WHERE clients_fts MATCH ? {filters}
+    ORDER BY c.date_start DESC, c.id DESC
+"""
+
+# Поиск проходом по броням в порядке дат (idx_clients_date_start / idx_clients_room_dates):
+# отбор по ФИО идёт в Python — lower() в SQLite не знает кириллицу.
+# Номера комнат подставляются из словаря, без JOIN на каждую строку.
+# Порядок (date_start, id) по убыванию — он же ключ страниц: следующая страница
+# начинается строго после последней строки предыдущей, (date_start, id) < (?, ?).
+_SQL_SEARCH_CLIENTS = """
+    SELECT id, fio, room_id, date_start, date_end
+    FROM clients
+    {where}
+    ORDER BY date_start DESC, id DESC
+"""
+
+_SQL_PAGE_AFTER = "(date_start, id) < (?, ?)"
+
+_SQL_UPDATE_WORKER_BY_KEY = """
+    UPDATE workers SET position = ?, contacts = ?, schedule = ?
+    WHERE fio_key = ?
+"""
+
+# имя → (запрос, пример параметров для EXPLAIN QUERY PLAN)
+HOT_QUERIES = {
+    "get_room_id_by_client": (_SQL_CLIENT_ROOM, (1,)),
+    "is_room_available": (_SQL_ROOM_OVERLAP, (1, "2025-01-31", "2025-01-01")),
+    "refresh_statuses": (_SQL_REFRESH_STATUSES.format(ids="?"), ("2025-01-01", "2025-01-01", 1)),
+    "delete_clients": (_SQL_CLIENTS_ROOMS.format(ids="?, ?"), (1, 2)),
+    "bookings_by_ids": (_SQL_BOOKINGS_BY_IDS.format(ids="?, ?"), (1, 2)),
+    "rooms_with_clients": (_SQL_ROOMS_WITH_CLIENTS.format(ids="?, ?"), (1, 2)),
+    "get_bookings_by_room_and_month": (_SQL_ROOM_MONTH_BOOKINGS, (1, "2025-01-31", "2025-01-01")),
+    "get_bookings_by_month": (_SQL_MONTH_BOOKINGS, ("2025-01-31", "2025-01-01")),
+    "room_statuses": (_SQL_ROOM_STATUSES, ("2025-01-01",)),
+    "booking_intervals": (_SQL_BOOKING_INTERVALS, ("2025-01-31", "2025-01-01")),
+    "monthly_stats": (_SQL_MONTHLY_STATS, (2025, 1, 2025, 12)),
+    "update_worker_by_fio_key": (_SQL_UPDATE_WORKER_BY_KEY, ("", "", "", "")),
+    "clients_page": (_SQL_SEARCH_CLIENTS.format(where="WHERE " + _SQL_PAGE_AFTER), ("2025-01-01", 1)),
+    "clients_room_page": (
+        _SQL_SEARCH_CLIENTS.format(where="WHERE room_id = ? AND " + _SQL_PAGE_AFTER), (1, "2025-01-01", 1)
+    ),
+}
+
+# Запросы к clients_fts проверяются, только если индекс создан (SQLite с FTS5)
+_FTS_HOT_QUERIES = {
+    "search_clients_fts": (_SQL_SEARCH_CLIENTS_FTS.format(filters="AND c.room_id = ?"), ('"ива"', 1)),
+}
+
+
+def _has_table(conn, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone() is not None
+
+
+def find_full_scans(db_path: str = "hotel5.db") -> dict:
+    """
+    Прогоняет EXPLAIN QUERY PLAN для всех HOT_QUERIES.
+
+    Возвращает {имя_запроса: [строки плана]} для запросов, в плане которых
+    есть полное сканирование (SCAN). Пустой словарь — все запросы индексные.
+    """
+    conn = _connect(db_path)
+    queries = dict(HOT_QUERIES)
+    if _has_table(conn, "clients_fts"):
+        queries.update(_FTS_HOT_QUERIES)
+    offenders = {}
+    for name, (sql, params) in queries.items():
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        # "SCAN ... VIRTUAL TABLE INDEX" — это поиск по индексу FTS5, а не полный проход
+        scans = [detail for *_, detail in plan
+                 if detail.startswith("SCAN") and "VIRTUAL TABLE INDEX" not in detail]
+        if scans:
+            offenders[name] = scans
+    return offenders
 
 
 class ClientRepository:
     def __init__(self, room_repo, db_path: str = "hotel5.db"):
         self.db_path = db_path
+        self.signals = RepositorySignals()
         self.room_repo = room_repo
+        self.cache = query_cache(db_path)
+        self._index = None  # BookingIndex, загружается при первой проверке занятости
+        self._index_changes = 0  # cache.external_changes на момент загрузки индекса
         self._create_table()
 
     def _create_table(self):
-        with _connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS clients (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fio TEXT NOT NULL,
-                    room_id INTEGER NOT NULL,
-                    date_start TEXT NOT NULL,
-                    date_end TEXT NOT NULL,
-                    FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE RESTRICT
-                )
-            """)
-            conn.commit()
+        conn = _connect(self.db_path)
+        _migrate(conn)
+        if not _has_table(conn, "clients_fts"):
+            # миграция индекса уже пройдена, но SQLite тогда не умел FTS5/trigram — пробуем снова
+            with conn:
+                conn.execute("BEGIN")
+                _create_clients_fts(conn)
 
     def get_room_id_by_client(self, client_id: int) -> int | None:
         """
         Возвращает room_id клиента по его id (источник истины — БД)
         """
         with _connect(self.db_path) as conn:
-            cur = conn.execute(
-                "SELECT room_id FROM clients WHERE id = ?",
-                (client_id,)
-            )
+            cur = conn.execute(_SQL_CLIENT_ROOM, (client_id,))
             row = cur.fetchone()
             return row[0] if row else None
+    # Сколько строк отдавать в один executemany при импорте
+    IMPORT_CHUNK = 1000
+
     def import_from_csv(self, csv_path: str):
         """
         Импортирует клиентов из CSV файла
@@ -47,10 +567,19 @@ class ClientRepository:
         ФИО;Номер комнаты;Заезд;Выезд
         Иванов Иван Иванович;101;27.11.2025;30.11.2025
         Петрова Анна Сергеевна;202;01.12.2025;05.12.2025
+
+        Номера берутся из словаря, построенного один раз; проверки вместимости идут
+        по индексу броней в памяти, куда сразу попадают и уже принятые строки файла.
+        Все строки вставляются пачками через executemany в одной транзакции,
+        статусы номеров пересчитываются один раз в конце.
         """
 
         added_count = 0
         errors = []
+        pending = []  # (fio, room_id, date_start_iso, date_end_iso)
+
+        rooms_by_number = {str(room.number): room for room in self.room_repo.get_all()}
+        index = self._booking_index()
 
         try:
             with open(csv_path, encoding='utf-8') as file:
@@ -68,47 +597,34 @@ class ClientRepository:
                             continue
 
                         # Находим room_id по номеру комнаты
-                        room = None
-                        for r in self.room_repo.get_all():
-                            if str(r.number) == room_number:
-                                room = r
-                                break
+                        room = rooms_by_number.get(room_number)
                         if not room:
                             errors.append(f"Строка {row_num}: номер {room_number} не найден")
                             continue
 
                         # Проверка формата дат
                         try:
-                            datetime.strptime(date_start, "%d.%m.%Y")
-                            datetime.strptime(date_end, "%d.%m.%Y")
+                            start_iso = datetime.strptime(date_start, "%d.%m.%Y").date().isoformat()
+                            end_iso = datetime.strptime(date_end, "%d.%m.%Y").date().isoformat()
                         except ValueError:
                             errors.append(f"Строка {row_num}: неверный формат даты (нужен ДД.ММ.ГГГГ)")
                             continue
 
-                        # Проверка пересечения дат
-                        if not self.is_room_available(room.id, date_start, date_end):
-                            errors.append(f"Строка {row_num}: номер {room_number} занят на {date_start}–{date_end}")
-                            continue
-
-                        # Проверка вместимости (по 1 человеку на запись)
-                        current = self.get_current_occupancy(room.id, date_start, date_end)
+                        # Проверка вместимости: по 1 человеку на запись, пик по дням
+                        # (с БД и с уже принятыми строками файла)
+                        current = index.peak_occupancy(room.id, start_iso, end_iso)
                         if current + 1 > room.capacity:
-                            errors.append(f"Строка {row_num}: в номере {room_number} нет мест")
+                            errors.append(f"Строка {row_num}: в номере {room_number} нет мест на {date_start}–{date_end}")
                             continue
 
-                        # Добавляем клиента
-                        self.add_client(
-                            fio=fio,
-                            room_id=room.id,
-                            date_start=date_start,
-                            date_end=date_end
-                        )
-                        added_count += 1
-
+                        # Принимаем строку: временный ключ в индексе до получения id из БД
+                        index.add(("csv", len(pending)), room.id, start_iso, end_iso)
+                        pending.append((fio, room.id, start_iso, end_iso))
 
                     except Exception as e:
                         errors.append(f"Строка {row_num}: ошибка — {str(e)}")
 
+            added_count = self._insert_imported(pending)
 
             return {
                 "added": added_count,
@@ -117,32 +633,205 @@ class ClientRepository:
 
 
         except Exception as e:
+            for i in range(len(pending)):
+                index.remove(("csv", i))
             return {
-                "added": added_count,
+                "added": 0,
                 "errors": [f"Ошибка чтения файла: {str(e)}"]
             }
 
+    def _insert_imported(self, pending: list) -> int:
+        """Записывает принятые строки импорта одной транзакцией, переводит индекс на настоящие id."""
+        if not pending:
+            return 0
+
+        conn = _connect(self.db_path)
+        with conn:
+            for chunk in _chunked(pending, self.IMPORT_CHUNK):
+                conn.executemany("""
+                    INSERT INTO clients (fio, room_id, date_start, date_end)
+                    VALUES (?, ?, ?, ?)
+                """, chunk)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.room_repo.refresh_statuses(conn, {room_id for _, room_id, _, _ in pending})
+        self.cache.invalidate()
+
+        first_id = last_id - len(pending) + 1
+        for i in range(len(pending)):
+            self._index.rekey(("csv", i), first_id + i)
+
+        self.signals.changed.emit(ChangeSet(reset=True))
+        self.room_repo.notify_updated({room_id for _, room_id, _, _ in pending})
+        return len(pending)
+
     def add_client(self, fio: str, room_id: int, date_start: str, date_end: str) -> int:
         with _connect(self.db_path) as conn:
             cur = conn.execute("""
                 INSERT INTO clients (fio, room_id, date_start, date_end)
                 VALUES (?, ?, ?, ?)
-            """, (fio, room_id, date_start, date_end))
+            """, (fio, room_id, _to_iso(date_start), _to_iso(date_end)))
             conn.commit()
             client_id = cur.lastrowid
+        self.cache.invalidate()
+        if self._index is not None:
+            self._index.add(client_id, room_id, _to_iso(date_start), _to_iso(date_end))
         self.room_repo.update_room_status(room_id)
 
+        self.signals.changed.emit(ChangeSet(inserted=self.get_bookings([client_id])))
+        self.room_repo.notify_updated([room_id])
         return client_id
 
+    def add_clients(self, fios: list[str], room_id: int, date_start: str, date_end: str) -> list[int]:
+        """
+        Заселяет группу гостей в один номер одной транзакцией.
+
+        Все строки вставляются через executemany, статус номера пересчитывается
+        один раз в той же транзакции. При ошибке откатывается вся группа.
+        Возвращает id добавленных клиентов.
+        """
+        if not fios:
+            return []
+        start_iso, end_iso = _to_iso(date_start), _to_iso(date_end)
+
+        conn = _connect(self.db_path)
+        with conn:
+            conn.executemany("""
+                INSERT INTO clients (fio, room_id, date_start, date_end)
+                VALUES (?, ?, ?, ?)
+            """, [(fio, room_id, start_iso, end_iso) for fio in fios])
+            # AUTOINCREMENT внутри одной транзакции выдаёт id подряд
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.room_repo.refresh_statuses(conn, [room_id])
+        self.cache.invalidate()
+
+        client_ids = list(range(last_id - len(fios) + 1, last_id + 1))
+        if self._index is not None:
+            for client_id in client_ids:
+                self._index.add(client_id, room_id, start_iso, end_iso)
+
+        self.signals.changed.emit(ChangeSet(inserted=self.get_bookings(client_ids)))
+        self.room_repo.notify_updated([room_id])
+        return client_ids
+
+    def get_bookings(self, client_ids) -> list:
+        """Брони клиентов client_ids вместе с данными номеров (Booking), одним запросом на пачку id."""
+        rows = _select_by_ids(_connect(self.db_path), _SQL_BOOKINGS_BY_IDS, client_ids)
+        return [
+            Booking(client_id, fio, number, room_type, _from_iso(date_start), _from_iso(date_end), room_id)
+            for client_id, fio, number, room_type, date_start, date_end, room_id in rows
+        ]
+
+    # Как часто (в строках) поиск проверяет, не отменён ли он
+    SEARCH_CHECK_EVERY = 1000
+
+    # trigram-индекс ищет строки от трёх символов; короче — только проход без индекса
+    FTS_MIN_LENGTH = 3
+    # Сколько броней (в порядке дат) просмотреть в поисках первой страницы,
+    # прежде чем перейти на индекс clients_fts
+    SEARCH_SCAN_BUDGET = 5000
+
+    def search(self, fio_text: str, room_id: int | None = None, should_stop=None, limit: int | None = None,
+               after: tuple | None = None):
+        """
+        Брони, у которых ФИО содержит fio_text (без учёта регистра), при room_id — только этого номера,
+        по (дате заезда, id) от новых к старым; limit — не больше стольких строк,
+        after — ключ страницы (см. page_key): только строки после него.
+
+        Частую подстроку быстрее найти проходом по броням в порядке дат: первая
+        страница набирается за несколько тысяч строк. Поэтому при limit сначала
+        просматривается до SEARCH_SCAN_BUDGET броней; не хватило — запрос идёт
+        через FTS5-индекс clients_fts (фильтр по номеру в том же SQL), где время
+        зависит только от числа совпадений. Без limit индекс используется сразу.
+        Строки короче FTS_MIN_LENGTH (или если FTS5 нет) ищутся только проходом.
+
+        Рассчитан на вызов из фонового потока: строки читаются курсором потоково,
+        should_stop() опрашивается каждые SEARCH_CHECK_EVERY строк; если он вернул
+        True, поиск прерывается и возвращает None.
+        """
+        needle = fio_text.strip().lower()
+        conn = _connect(self.db_path)
+        rooms = {room: (number, room_type) for room, number, room_type
+                 in conn.execute("SELECT id, number, room_type FROM rooms")}
+        use_fts = len(needle) >= self.FTS_MIN_LENGTH and _has_table(conn, "clients_fts")
+
+        filters, params = [], []
+        if room_id is not None:
+            filters.append("room_id = ?")
+            params.append(room_id)
+        if after is not None:
+            filters.append(_SQL_PAGE_AFTER)
+            params.extend(after)
+
+        if not use_fts or limit is not None:
+            budget = self.SEARCH_SCAN_BUDGET if use_fts else None
+            sql = _SQL_SEARCH_CLIENTS.format(where="WHERE " + " AND ".join(filters) if filters else "")
+            results = self._collect(conn.execute(sql, params), rooms, needle, should_stop, limit, budget)
+            if results is not None or not use_fts:
+                return results
+            if should_stop is not None and should_stop():
+                return None
+
+        # колонки фильтров есть только в clients, поэтому подходят и к запросу с clients_fts
+        sql = _SQL_SEARCH_CLIENTS_FTS.format(filters="".join(" AND " + f for f in filters))
+        params = ['"' + needle.replace('"', '""') + '"'] + params
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._collect(conn.execute(sql, params), rooms, None, should_stop, limit, None)
+
+    # Строк на страницу вкладки «Клиенты»
+    PAGE_SIZE = 200
+
+    def get_page(self, fio_text: str = "", room_id: int | None = None, after: tuple | None = None,
+                 limit: int = PAGE_SIZE) -> list:
+        """
+        Страница броней (Booking) по фильтрам, в порядке (дата заезда, id) по убыванию.
+        Следующая страница — get_page(..., after=page_key(последняя_бронь)). Ключ — позиция
+        в индексе, а не номер строки (OFFSET), поэтому любая страница стоит одного
+        поиска по индексу, а вставки и удаления не сдвигают уже загруженные строки.
+        """
+        return self.search(fio_text, room_id, limit=limit, after=after)
+
+    @staticmethod
+    def page_key(booking) -> tuple:
+        """Ключ страницы после брони booking: (date_start ISO, id)."""
+        return _to_iso(booking.date_start), booking.id
+
+    def _collect(self, cursor, rooms, needle, should_stop, limit, budget):
+        """
+        Собирает Booking из строк (id, fio, room_id, date_start, date_end); rooms — {room_id: (number, room_type)},
+        needle — отбор по ФИО в Python (None — без отбора).
+        Возвращает None, если поиск отменён или за budget строк не набралось limit совпадений.
+        """
+        results = []
+        for n, (client_id, fio, room_id, date_start, date_end) in enumerate(cursor):
+            if n % self.SEARCH_CHECK_EVERY == 0 and should_stop is not None and should_stop():
+                return None
+            if n == budget:
+                return None
+            room = rooms.get(room_id)
+            if room is not None and (needle is None or needle in fio.lower()):
+                results.append(Booking(client_id, fio, room[0], room[1],
+                                       _from_iso(date_start), _from_iso(date_end), room_id))
+                if len(results) == limit:
+                    break
+        return results
+
     def get_all_with_room_info(self):
+        return list(self.cache.get("bookings_with_rooms", self._load_all_with_room_info))
+
+    def _load_all_with_room_info(self):
         with _connect(self.db_path) as conn:
             cur = conn.execute("""
                 SELECT c.id, c.fio, r.number, r.room_type, c.date_start, c.date_end, r.id AS room_id
                 FROM clients c
                 JOIN rooms r ON c.room_id = r.id
-                ORDER BY c.date_start DESC
+                ORDER BY c.date_start DESC, c.id DESC
             """)
-            return cur.fetchall()
+            return [
+                Booking(client_id, fio, number, room_type, _from_iso(date_start), _from_iso(date_end), room_id)
+                for client_id, fio, number, room_type, date_start, date_end, room_id in cur
+            ]
 
     def update_client(self, client_id: int, fio: str, room_id: int, date_start: str, date_end: str):
         old_room_id = self.get_room_id_by_client(client_id)
@@ -152,95 +841,185 @@ class ClientRepository:
                 UPDATE clients 
                 SET fio=?, room_id=?, date_start=?, date_end=?
                 WHERE id=?
-            """, (fio, room_id, date_start, date_end, client_id))
+            """, (fio, room_id, _to_iso(date_start), _to_iso(date_end), client_id))
             conn.commit()
+        self.cache.invalidate()
+        if self._index is not None:
+            self._index.update(client_id, room_id, _to_iso(date_start), _to_iso(date_end))
         if old_room_id is not None:
             self.room_repo.update_room_status(old_room_id)
 
         if old_room_id != room_id:
             self.room_repo.update_room_status(room_id)
 
-    def delete_clients(self, client_ids: list[int]):
-        room_ids = set()
-
-        for client_id in client_ids:
-            room_id = self.get_room_id_by_client(client_id)
-            if room_id:
-                room_ids.add(room_id)
-
-            with _connect(self.db_path) as conn:
-                conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+        self.signals.changed.emit(ChangeSet(updated=self.get_bookings([client_id])))
+        self.room_repo.notify_updated({old_room_id, room_id} - {None})
 
-        for room_id in room_ids:
-            self.room_repo.update_room_status(room_id)
+    def delete_clients(self, client_ids: list[int]) -> dict:
+        """
+        Удаляет клиентов одной транзакцией (DELETE ... WHERE id IN (...)) и один раз
+        пересчитывает статусы затронутых номеров.
+        Возвращает {client_id: True, если запись была и удалена}.
+        """
+        client_ids = list(client_ids)
+        rows = []
+
+        conn = _connect(self.db_path)
+        with conn:
+            for chunk in _chunked(client_ids):
+                ids = _placeholders(len(chunk))
+                rows += conn.execute(_SQL_CLIENTS_ROOMS.format(ids=ids), chunk).fetchall()
+                conn.execute(f"DELETE FROM clients WHERE id IN ({ids})", chunk)
+            self.room_repo.refresh_statuses(conn, {room_id for _, room_id in rows})
+        self.cache.invalidate()
+
+        deleted = {client_id for client_id, _ in rows}
+        if self._index is not None:
+            for client_id in deleted:
+                self._index.remove(client_id)
+
+        if deleted:
+            self.signals.changed.emit(ChangeSet(deleted=deleted))
+            self.room_repo.notify_updated({room_id for _, room_id in rows})
+        return {client_id: client_id in deleted for client_id in client_ids}
 
     def get_bookings_by_month(self, year: int, month: int):
-        start = f"01.{month:02d}.{year}"
-        end = f"{calendar.monthrange(year, month)[1]:02d}.{month:02d}.{year}"
+        start = f"{year}-{month:02d}-01"
+        end = f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
 
         with _connect(self.db_path) as conn:
-            cur = conn.execute("""
-                SELECT r.room_type, c.date_start, c.date_end, r.price
-                FROM clients c
-                JOIN rooms r ON c.room_id = r.id
-                WHERE c.date_start <= ? AND c.date_end >= ?
-            """, (end, start))
-            return [{'room_type': r[0], 'date_start': r[1], 'date_end': r[2], 'price': r[3]} for r in cur.fetchall()]
+            cur = conn.execute(_SQL_MONTH_BOOKINGS, (end, start))
+            return [
+                {'room_type': r[0], 'date_start': _from_iso(r[1]), 'date_end': _from_iso(r[2]), 'price': r[3]}
+                for r in cur.fetchall()
+            ]
 
     def get_bookings_by_room_and_month(self, room_id: int, year: int, month: int):
         """
         Возвращает все брони конкретного номера за конкретный месяц (пересекающие)
         """
-        start_date = f"01.{month:02d}.{year}"
-        end_date = f"{calendar.monthrange(year, month)[1]:02d}.{month:02d}.{year}"
+        start_date = f"{year}-{month:02d}-01"
+        end_date = f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
 
         with _connect(self.db_path) as conn:
-            cur = conn.execute("""
-                SELECT date_start, date_end FROM clients
-                WHERE room_id = ?
-                  AND date_start <= ?
-                  AND date_end >= ?
-            """, (room_id, end_date, start_date))
-            return cur.fetchall()
-    def normalize(self, date_str: str) -> str:
-        return f"{date_str[6:10]}-{date_str[3:5]}-{date_str[0:2]}"
-
-    def get_room_by_id(self, room_id):
-        return self.room_repo.get_by_id(room_id)
+            cur = conn.execute(_SQL_ROOM_MONTH_BOOKINGS, (room_id, end_date, start_date))
+            return [(_from_iso(date_start), _from_iso(date_end)) for date_start, date_end in cur.fetchall()]
 
-    def is_room_available(self, room_id: int, date_start: str, date_end: str) -> bool:
+    def get_booking_intervals(self, first_day, last_day) -> list:
         """
-        Возвращает True, если номер свободен на указанные даты.
-        Исправлено: сравнение дат происходит правильно, а не как строк.
+        Брони, пересекающие период [first_day, last_day] (date), для report_engine:
+        [(client_id, room_id, день заезда, день выезда)], дни — date.toordinal().
         """
-        start = self.normalize(date_start)
-        end = self.normalize(date_end)
+        return _connect(self.db_path).execute(
+            _SQL_BOOKING_INTERVALS, (last_day.isoformat(), first_day.isoformat())
+        ).fetchall()
 
+    def get_range_report(self, first_day, last_day, should_stop=None, progress=None, store=None, rooms=None):
+        """
+        Отчёт по номерам помесячно за месяцы с first_day по last_day и сводный за весь период
+        (см. report_engine.build_range_report): ([Report по месяцам], Report за период).
+
+        Закрытые месяцы (закончились до сегодня) берутся из monthly_room_stats.
+        Остальные считаются по месяцу за проход по броням месяца, и закрытые
+        из них сохраняются в кэш. Сводный отчёт складывается из месячных
+        (report_engine.rollup), без чтения броней.
+
+        Можно вызывать из фонового потока: progress(готово, всего) сообщает, сколько
+        месяцев уже готово (в начале и после каждого посчитанного месяца),
+        should_stop() проверяется перед каждым месяцем; если он вернул True,
+        отчёт не досчитывается и возвращается None.
+        store(rows) получает строки закрытых месяцев вместо записи в кэш: фоновый
+        поток отдаёт их GUI-потоку (save_monthly_stats), иначе его запись для
+        остальных соединений выглядит как изменение файла и сбрасывает QueryCache.
+        rooms — список Room; фоновый поток получает его от GUI-потока, чтобы
+        не заполнять общий QueryCache в обход его сбросов.
+        """
+        if store is None:
+            store = self.save_monthly_stats
+        if rooms is None:
+            rooms = self.room_repo.get_all()
+        months = period_bounds(first_day, last_day, "month")
+        conn = _connect(self.db_path)
+
+        cached = {}  # (год, месяц) → {room_id: (occupied_days, guests, carried_in)}
+        for year, month, room_id, *stats in conn.execute(
+            _SQL_MONTHLY_STATS, (first_day.year, first_day.month, last_day.year, last_day.month)
+        ):
+            cached.setdefault((year, month), {})[room_id] = stats
+
+        missing = [(first, last) for first, last in months if (first.year, first.month) not in cached]
+        done = len(months) - len(missing)
+        today = date.today()
+        if progress is not None:
+            progress(done, len(months))
+        for first, last in missing:
+            if should_stop is not None and should_stop():
+                return None
+
+            report = build_reports(rooms, self.get_booking_intervals(first, last), first, last, "month")[0]
+            key = (first.year, first.month)
+            cached[key] = {stats.room.id: (stats.occupied_days, stats.guests, stats.carried_in)
+                           for stats in report.rooms}
+            if last < today:
+                store([key + (room_id,) + tuple(stats) for room_id, stats in cached[key].items()])
+
+            done += 1
+            if progress is not None:
+                progress(done, len(months))
+
+        monthly = [
+            Report(first, last, [
+                RoomStats(room, (last - first).days + 1, *cached[(first.year, first.month)].get(room.id, (0, 0, 0)))
+                for room in rooms
+            ])
+            for first, last in months
+        ]
+        return monthly, rollup(monthly)
+
+    def save_monthly_stats(self, rows):
+        """Сохраняет показатели закрытых месяцев: (год, месяц, room_id, занято дней, гостей, переходящих)."""
         with _connect(self.db_path) as conn:
-            cur = conn.execute("""
-                SELECT 1 FROM clients
-                WHERE room_id = ?
-
-                -- Проверка пересечения интервалов
-                  AND (
-                        (substr(date_start, 7, 4) || '-' || substr(date_start, 4, 2) || '-' || substr(date_start, 1, 2)) <= ?
-                    AND (substr(date_end,   7, 4) || '-' || substr(date_end,   4, 2) || '-' || substr(date_end,   1, 2)) >= ?
-                  )
+            conn.executemany("INSERT OR REPLACE INTO monthly_room_stats VALUES (?, ?, ?, ?, ?, ?)", rows)
 
-                LIMIT 1
-            """, (room_id, end, start))
+    def get_room_by_id(self, room_id):
+        return self.room_repo.get_by_id(room_id)
 
-            return cur.fetchone() is None
+    def _booking_index(self) -> BookingIndex:
+        """
+        Индекс броней в памяти: один SELECT при первом обращении, дальше — без запросов к БД.
+        Перечитывается, если файл БД изменили в обход этого процесса/потока.
+        """
+        self.cache.check_external_changes()
+        if self._index is None or self._index_changes != self.cache.external_changes:
+            index = BookingIndex()
+            with _connect(self.db_path) as conn:
+                index.load(conn.execute("SELECT id, room_id, date_start, date_end FROM clients"))
+            self._index = index
+            self._index_changes = self.cache.external_changes
+        return self._index
 
-    def get_current_occupancy(self, room_id: int, date_start: str, date_end: str) -> int:
-        with _connect(self.db_path) as conn:
-            cur = conn.execute("""
-                SELECT COUNT(*) FROM clients
-                WHERE room_id = ?
-                  AND date_start <= ?
-                  AND date_end >= ?
-            """, (room_id, date_end, date_start))
-            return cur.fetchone()[0]
+    def is_room_available(self, room_id: int, date_start: str, date_end: str,
+                          exclude_client_id: int | None = None) -> bool:
+        """
+        Возвращает True, если номер свободен на указанные даты.
+        exclude_client_id — бронь, которую не учитывать (редактируемый клиент).
+        """
+        return self._booking_index().is_available(
+            room_id, _to_iso(date_start), _to_iso(date_end), exclude_client_id
+        )
+
+    def get_current_occupancy(self, room_id: int, date_start: str, date_end: str,
+                              exclude_client_id: int | None = None) -> int:
+        return self._booking_index().occupancy(
+            room_id, _to_iso(date_start), _to_iso(date_end), exclude_client_id
+        )
+
+    def get_peak_occupancy(self, room_id: int, date_start: str, date_end: str,
+                           exclude_client_id: int | None = None) -> int:
+        """Максимальное число гостей в номере в какой-либо из дней периода."""
+        return self._booking_index().peak_occupancy(
+            room_id, _to_iso(date_start), _to_iso(date_end), exclude_client_id
+        )
 
 class UserRepository:
     def __init__(self):
@@ -281,41 +1060,49 @@ class UserRepository:
 class RoomRepository:
     def __init__(self, db_path: str = "hotel5.db"):
         self.db_path = db_path
+        self.cache = query_cache(db_path)
+        self.signals = RepositorySignals()
         self._create_table()
 
     def _create_table(self):
-            with _connect(self.db_path) as conn:
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS rooms (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        number INTEGER UNIQUE NOT NULL,
-                        room_type TEXT NOT NULL,
-                        capacity INTEGER NOT NULL,
-                        price INTEGER NOT NULL,
-                        status TEXT DEFAULT 'free'
-                    )
-                """)
-
-                conn.commit()
+        _migrate(_connect(self.db_path))
 
     def get_all(self):
+        return list(self.cache.get("rooms", self._load_all))
+
+    def _load_all(self):
         with _connect(self.db_path) as conn:
             cur = conn.execute("SELECT id, number, room_type, capacity, price, status FROM rooms ORDER BY number")
-            return [self._row_to_room(row) for row in cur.fetchall()]
+            return [Room(*row) for row in cur]
 
     def get_by_id(self, room_id: int):
-        with _connect(self.db_path) as conn:
-            cur = conn.execute(
-                "SELECT id, number, room_type, capacity, price, status FROM rooms WHERE id = ?",
-                (room_id,)
-            )
-            row = cur.fetchone()
-            return self._row_to_room(row) if row else None
+        rooms_by_id = self.cache.get("rooms_by_id", lambda: {room.id: room for room in self.get_all()})
+        return rooms_by_id.get(room_id)
+
+    def get_many(self, room_ids) -> list:
+        rows = _select_by_ids(
+            _connect(self.db_path),
+            "SELECT id, number, room_type, capacity, price, status FROM rooms WHERE id IN ({ids})",
+            room_ids
+        )
+        return [Room(*row) for row in rows]
+
+    def notify_updated(self, room_ids):
+        """
+        Сообщает подписчикам, что номера room_ids изменились.
+        Вызывается и репозиторием клиентов: заселение и выезд меняют статус номера.
+        """
+        room_ids = list(room_ids)
+        if room_ids:
+            self.signals.changed.emit(ChangeSet(updated=self.get_many(room_ids)))
 
     def import_from_csv(self, csv_path: str):
         """
         Импортирует номера из CSV.
         Полностью совместим с «красивым» экспортом (статусы типа "Занят до 30.11").
+
+        Строки разбираются генератором и пишутся одним executemany с
+        INSERT ... ON CONFLICT(id) DO UPDATE в одной транзакции.
         """
         added = 0
         updated = 0
@@ -333,11 +1120,17 @@ class RoomRepository:
                     errors.append(f"Отсутствуют обязательные колонки: {', '.join(missing)}")
                     return {"added": added, "updated": updated, "skipped": skipped, "errors": errors}
 
-            with _connect(self.db_path) as conn:
+                conn = _connect(self.db_path)
+                # Кому принадлежит каждый номер комнаты — чтобы UNIQUE(number) не оборвал весь пакет
+                numbers = dict(conn.execute("SELECT id, number FROM rooms"))
+                owners = {number: room_id for room_id, number in numbers.items()}
+
+                def parsed_rows():
+                    nonlocal skipped
                     for row_num, row in enumerate(reader, start=2):  # start=2 — пропускаем заголовок
                         try:
                             # Читаем и чистим все поля
-                            number = row["№"].strip()
+                            number_str = row["№"].strip()
                             room_type = row["Тип"].strip()
                             capacity_str = row["Вместимость"].strip()
                             price_str = row["Цена в сутки"].strip()
@@ -345,13 +1138,14 @@ class RoomRepository:
                             id_str = row["ID"].strip()
 
                             # Проверка на пустые обязательные поля
-                            if not all([number, room_type, capacity_str, price_str, id_str]):
+                            if not all([number_str, room_type, capacity_str, price_str, id_str]):
                                 errors.append(f"Строка {row_num}: пустые обязательные поля")
                                 skipped += 1
                                 continue
 
-
                             try:
+                                # Номер сравнивается с БД как число (колонка INTEGER): '0101' — это 101
+                                number = int(number_str)
                                 room_id = int(id_str)
                                 capacity = int(capacity_str)
 
@@ -362,36 +1156,49 @@ class RoomRepository:
                                 if room_id <= 0 or capacity < 1 or price < 0:
                                     raise ValueError("Недопустимые значения (ID>0, вместимость≥1, цена≥0)")
 
-                            except ValueError as ve:
+                            except ValueError:
                                 errors.append(
                                     f"Строка {row_num}: неверные числа — "
-                                    f"ID='{id_str}', Вместимость='{capacity_str}', Цена='{price_str}'"
+                                    f"№='{number_str}', ID='{id_str}', Вместимость='{capacity_str}', Цена='{price_str}'"
                                 )
                                 skipped += 1
                                 continue
 
+                            if owners.get(number, room_id) != room_id:
+                                errors.append(f"Строка {row_num}: номер {number} уже занят другим ID")
+                                skipped += 1
+                                continue
+                            owners.pop(numbers.get(room_id), None)
+                            owners[number] = room_id
+                            numbers[room_id] = number
 
                             status = "busy" if "занят" in raw_status.lower() else "free"
-                            cur = conn.execute("SELECT id FROM rooms WHERE id = ?", (room_id,))
-                            if cur.fetchone():  # номер уже существует → обновляем
-                                conn.execute("""
-                                    UPDATE rooms 
-                                    SET number=?, room_type=?, capacity=?, price=?, status=?
-                                    WHERE id=?
-                                """, (number, room_type, capacity, price, status, room_id))
-                                updated += 1
-                            else:  # новый номер → вставляем
-                                conn.execute("""
-                                    INSERT INTO rooms (id, number, room_type, capacity, price, status)
-                                    VALUES (?, ?, ?, ?, ?, ?)
-                                """, (room_id, number, room_type, capacity, price, status))
-                                added += 1
+                            yield room_id, number, room_type, capacity, price, status
 
                         except Exception as e:
                             errors.append(f"Строка {row_num}: неожиданная ошибка — {str(e)}")
                             skipped += 1
 
-                    conn.commit()
+                with conn:
+                    count_before = conn.execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+                    cur = conn.executemany("""
+                        INSERT INTO rooms (id, number, room_type, capacity, price, status)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            number = excluded.number,
+                            room_type = excluded.room_type,
+                            capacity = excluded.capacity,
+                            price = excluded.price,
+                            status = excluded.status
+                    """, parsed_rows())
+                    count_after = conn.execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+                self.cache.invalidate()
+
+                # Каждая строка — либо вставка (растёт число номеров), либо обновление
+                added = count_after - count_before
+                updated = cur.rowcount - added
+                if cur.rowcount:
+                    self.signals.changed.emit(ChangeSet(reset=True))
 
             return {
                 "added": added,
@@ -402,8 +1209,8 @@ class RoomRepository:
 
         except Exception as e:
             return {
-                "added": added,
-                "updated": updated,
+                "added": 0,
+                "updated": 0,
                 "skipped": skipped,
                 "errors": [f"Ошибка чтения файла: {str(e)}"]
             }
@@ -411,13 +1218,15 @@ class RoomRepository:
     def add(self, number: int, room_type: str, capacity: int, price: int):
         with _connect(self.db_path) as conn:
             try:
-                conn.execute("""
+                cur = conn.execute("""
                     INSERT INTO rooms (number, room_type, capacity, price, status)
                     VALUES (?, ?, ?, ?, 'free')
                 """, (number, room_type, capacity, price))
                 conn.commit()
             except sqlite3.IntegrityError:
                 raise ValueError(f"Номер {number} уже существует!")
+        self.cache.invalidate()
+        self.signals.changed.emit(ChangeSet(inserted=self.get_many([cur.lastrowid])))
 
     def update(self, room_id: int, number: int, room_type: str, capacity: int, price: int):
         with _connect(self.db_path) as conn:
@@ -429,73 +1238,77 @@ class RoomRepository:
                 conn.commit()
             except sqlite3.IntegrityError:
                 raise ValueError(f"Номер {number} уже занят другим!")
+        self.cache.invalidate()
+        self.notify_updated([room_id])
 
-    def delete(self, room_id: int):
-        with _connect(self.db_path) as conn:
-            # Проверяем, есть ли клиенты в номере
-            cur = conn.execute("SELECT COUNT(*) FROM clients WHERE room_id = ?", (room_id,))
-            if cur.fetchone()[0] > 0:
-                raise ValueError("Невозможно удалить номер: в нём есть клиенты!")
+    ROOM_HAS_CLIENTS = "Невозможно удалить номер: в нём есть клиенты!"
+    ROOM_NOT_FOUND = "Номер не найден (возможно, уже удалён)"
 
-            # Если нет клиентов — удаляем
-            conn.execute("DELETE FROM rooms WHERE id=?", (room_id,))
-            conn.commit()
+    def delete(self, room_id: int):
+        error = self.delete_many([room_id])[room_id]
+        if error:
+            raise ValueError(error)
 
+    def delete_many(self, room_ids: list[int]) -> dict:
+        """
+        Удаляет номера одной транзакцией.
+        Номера, в которых есть клиенты, не удаляются.
+        Возвращает {room_id: None — удалён | текст ошибки (ROOM_HAS_CLIENTS, ROOM_NOT_FOUND)}.
+        """
+        room_ids = list(room_ids)
+        existing = set()
+        blocked = set()
+
+        conn = _connect(self.db_path)
+        with conn:
+            for chunk in _chunked(room_ids):
+                ids = _placeholders(len(chunk))
+                existing.update(room_id for (room_id,) in conn.execute(
+                    f"SELECT id FROM rooms WHERE id IN ({ids})", chunk
+                ))
+                # Проверяем, есть ли клиенты в номерах
+                blocked.update(room_id for (room_id,) in conn.execute(
+                    _SQL_ROOMS_WITH_CLIENTS.format(ids=ids), chunk
+                ))
+            free = [room_id for room_id in room_ids if room_id in existing and room_id not in blocked]
+            for chunk in _chunked(free):
+                conn.execute(f"DELETE FROM rooms WHERE id IN ({_placeholders(len(chunk))})", chunk)
+        self.cache.invalidate()
+        if free:
+            self.signals.changed.emit(ChangeSet(deleted=free))
+
+        return {
+            room_id: self.ROOM_NOT_FOUND if room_id not in existing
+            else self.ROOM_HAS_CLIENTS if room_id in blocked
+            else None
+            for room_id in room_ids
+        }
 
 
-    def _row_to_room(self, row):
-        return type('Room', (), {
-            'id': row[0],
-            'number': row[1],
-            'room_type': row[2],
-            'capacity': row[3],
-            'price': row[4],
-            'status': row[5]
-        })()
 
     def get_all_room_statuses(self):
         """
         Возвращает словарь {room_id: (status, status_text, color)}
         Статусы вычисляются для всех комнат за один раз.
-        """
-        today_str = QtCore.QDate.currentDate().toString("dd.MM.yyyy")
-        today_iso = self._normalize_date(today_str)
+        Номера без текущих и будущих броней в словарь не попадают — они свободны.
 
-        with _connect(self.db_path) as conn:
-            # Берём все комнаты
-            rooms = conn.execute("SELECT id, number FROM rooms").fetchall()
-
-            # Берём все текущие брони на сегодня
-            cur_bookings = conn.execute(f"""
-                SELECT room_id, date_end FROM clients
-                WHERE (substr(date_start, 7,4) || '-' || substr(date_start, 4,2) || '-' || substr(date_start, 1,2)) <= ?
-                  AND (substr(date_end,   7,4) || '-' || substr(date_end,   4,2) || '-' || substr(date_end,   1,2)) >= ?
-            """, (today_iso, today_iso)).fetchall()
-            current_dict = {r[0]: r[1] for r in cur_bookings}  # {room_id: date_end}
-
-            # Берём ближайшие брони после сегодня
-            next_bookings = conn.execute(f"""
-                SELECT room_id, date_start FROM clients
-                WHERE (substr(date_start, 7,4) || '-' || substr(date_start, 4,2) || '-' || substr(date_start, 1,2)) > ?
-                ORDER BY room_id, (substr(date_start, 7,4) || substr(date_start, 4,2) || substr(date_start, 1,2))
-            """, (today_iso,)).fetchall()
-            next_dict = {}
-            for room_id, date_start in next_bookings:
-                if room_id not in next_dict:
-                    next_dict[room_id] = date_start
-
-            # Формируем итоговый словарь
-            statuses = {}
-            for room_id, number in rooms:
-                if room_id in current_dict:
-                    end_date = QtCore.QDate.fromString(current_dict[room_id], "dd.MM.yyyy")
-                    statuses[room_id] = ("busy", f"Занят до {end_date.toString('dd.MM')}", "#dc3545")
-                elif room_id in next_dict:
-                    next_start = QtCore.QDate.fromString(next_dict[room_id], "dd.MM.yyyy")
-                    statuses[room_id] = ("free", f"Свободен до {next_start.toString('dd.MM')}", "#28a745")
-                else:
-                    statuses[room_id] = ("free", "Свободен", "#28a745")
+        Результат запоминается на день: QueryCache сбрасывает его при любой записи
+        и при смене PRAGMA data_version, так что повторные вызовы (фильтры вкладки
+        «Номера») не ходят в БД.
+        """
+        today_iso = date.today().isoformat()
+        return dict(self.cache.get(("room_statuses", today_iso), lambda: self._load_room_statuses(today_iso)))
+
+    def _load_room_statuses(self, today_iso: str) -> dict:
+        statuses = {}
+        for room_id, stay_end, next_start in _connect(self.db_path).execute(_SQL_ROOM_STATUSES, (today_iso,)):
+            # ISO 'гггг-мм-дд' → 'дд.мм' срезами строки, без разбора даты
+            if stay_end is not None:
+                statuses[room_id] = ("busy", f"Занят до {stay_end[8:10]}.{stay_end[5:7]}", "#dc3545")
+            else:
+                statuses[room_id] = ("free", f"Свободен до {next_start[8:10]}.{next_start[5:7]}", "#28a745")
         return statuses
+
     def update_all_room_statuses(self):
         rooms = self.get_all()
         for room in rooms:
@@ -504,52 +1317,25 @@ class RoomRepository:
     def update_room_status(self, room_id: int):
         """Автоматически меняет статус номера: free / busy"""
         with _connect(self.db_path) as conn:
-            # Проверяем, есть ли активные брони на этот номер
-            today = QtCore.QDate.currentDate().toString("dd.MM.yyyy")
-            cur = conn.execute("""
-                SELECT COUNT(*) FROM clients 
-                WHERE room_id = ? 
-                AND date_start <= ? 
-                AND date_end >= ?
-            """, (room_id, today, today))
-
-            is_busy = cur.fetchone()[0] > 0
-            status = 'busy' if is_busy else 'free'
-
-            conn.execute("UPDATE rooms SET status = ? WHERE id = ?", (status, room_id))
-            conn.commit()
-    def normalize(self, date_str: str) -> str:
-        return f"{date_str[6:10]}-{date_str[3:5]}-{date_str[0:2]}"
+            self.refresh_statuses(conn, [room_id])
+        self.cache.invalidate()
 
-    def _normalize_date(self, date_str: str) -> str:
+    def refresh_statuses(self, conn, room_ids):
         """
-        '15.03.2025' → '2025-03-15'
-        Вынесено в отдельный метод — используется везде
+        Пересчитывает free/busy для набора номеров — по UPDATE на пачку из _IN_CHUNK id.
+        Работает в транзакции переданного соединения и сам не коммитит —
+        так статусы обновляются атомарно вместе с изменением броней.
         """
-        if not date_str or len(date_str) != 10:
-            return "9999-99-99"  # защита
-        return f"{date_str[6:10]}-{date_str[3:5]}-{date_str[0:2]}"
+        today = QtCore.QDate.currentDate().toString("yyyy-MM-dd")
+        for chunk in _chunked(list(room_ids)):
+            conn.execute(_SQL_REFRESH_STATUSES.format(ids=_placeholders(len(chunk))), (today, today, *chunk))
 
     def is_room_available(self, room_id: int, date_start: str, date_end: str) -> bool:
         """
         Проверяет, свободен ли номер в указанный период.
         """
-        start_iso = self._normalize_date(date_start)
-        end_iso = self._normalize_date(date_end)
-
         with _connect(self.db_path) as conn:
-            cur = conn.execute("""
-                SELECT 1 FROM clients
-                WHERE room_id = ?
-                  AND (
-                        -- существующая бронь начинается до конца новой
-                        (substr(date_start, 7,4) || '-' || substr(date_start, 4,2) || '-' || substr(date_start, 1,2)) <= ?
-                    AND
-                        -- существующая бронь заканчивается после начала новой
-                        (substr(date_end,   7,4) || '-' || substr(date_end,   4,2) || '-' || substr(date_end,   1,2)) >= ?
-                  )
-                LIMIT 1
-            """, (room_id, end_iso, start_iso))
+            cur = conn.execute(_SQL_ROOM_OVERLAP, (room_id, _to_iso(date_end), _to_iso(date_start)))
 
             return cur.fetchone() is None  # True = свободен
 
@@ -557,24 +1343,28 @@ class RoomRepository:
 class WorkerRepository:
     def __init__(self, db_path: str = "hotel5.db"):
         self.db_path = db_path
+        self.cache = query_cache(db_path)
+        self.signals = RepositorySignals()
+        self._index = None  # WorkerIndex, строится при первом поиске
+        self._index_changes = 0
         self._create_table()
 
     def _create_table(self):
-        with _connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS workers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fio TEXT NOT NULL,
-                    position TEXT NOT NULL,
-                    contacts TEXT,
-                    schedule TEXT DEFAULT 'Пн-Пт 9:00-18:00'
-                )
-            """)
-            conn.commit()
+        _migrate(_connect(self.db_path))
 
-    def import_from_csv(self, csv_path: str):
+    IMPORT_CHUNK = 1000
+
+    def import_from_csv(self, csv_path: str, update_existing: bool = False):
+        """
+        Импортирует сотрудников из CSV (ФИО;Контакты;График;Должность).
 
+        Дубли ищутся по нормализованному ФИО в множестве ключей, загруженном
+        одним запросом. Новые записи вставляются пачками через executemany.
+        update_existing=True — дубли не пропускаются, а обновляют должность,
+        контакты и график существующей записи (по индексу fio_key).
+        """
         added = 0
+        updated = 0
         skipped = 0
         errors = []
 
@@ -587,73 +1377,150 @@ class WorkerRepository:
                 if not required.issubset(set(reader.fieldnames or [])):
                     missing = required - set(reader.fieldnames or [])
                     errors.append(f"Отсутствуют колонки: {', '.join(missing)}")
-                    return {"added": added, "skipped": skipped, "errors": errors}
-
-                with _connect(self.db_path) as conn:
-                    for row_num, row in enumerate(reader, start=2):
-                        try:
-                            fio = row["ФИО"].strip()
-                            contacts = row["Контакты"].strip()
-                            schedule = row["График"].strip()
-                            position = row["Должность"].strip()
-
-                            if not fio or not position:
-                                errors.append(f"Строка {row_num}: не заполнены ФИО или Должность")
-                                skipped += 1
-                                continue
-
-                            # Проверяем дубли по ФИО (чтобы не было повторов)
-                            cur = conn.execute("SELECT id FROM workers WHERE fio = ?", (fio,))
-                            if cur.fetchone():
-                                skipped += 1
-                                continue  # или можно обновлять — но пока просто пропускаем
+                    return {"added": added, "updated": updated, "skipped": skipped, "errors": errors}
 
-                            conn.execute("""
-                                INSERT INTO workers (fio, position, contacts, schedule)
-                                VALUES (?, ?, ?, ?)
-                            """, (fio, position, contacts or None, schedule or "5/2"))
+                conn = _connect(self.db_path)
+                existing = {key for (key,) in conn.execute("SELECT fio_key FROM workers")}
+                to_insert = []
+                to_update = {}  # fio_key → (position, contacts, schedule, fio_key), последняя строка побеждает
 
-                            added += 1
+                for row_num, row in enumerate(reader, start=2):
+                    try:
+                        fio = row["ФИО"].strip()
+                        contacts = row["Контакты"].strip()
+                        schedule = row["График"].strip()
+                        position = row["Должность"].strip()
 
-                        except Exception as e:
-                            errors.append(f"Строка {row_num}: {str(e)}")
+                        if not fio or not position:
+                            errors.append(f"Строка {row_num}: не заполнены ФИО или Должность")
                             skipped += 1
+                            continue
 
-                    conn.commit()
+                        # Проверяем дубли по ФИО (и в базе, и выше в этом же файле)
+                        key = fio_key(fio)
+                        if key in existing:
+                            if update_existing:
+                                to_update[key] = (position, contacts or None, schedule or "5/2", key)
+                            else:
+                                skipped += 1
+                            continue
 
-            return {"added": added, "skipped": skipped, "errors": errors}
+                        existing.add(key)
+                        to_insert.append((fio, position, contacts or None, schedule or "5/2", key))
+
+                    except Exception as e:
+                        errors.append(f"Строка {row_num}: {str(e)}")
+                        skipped += 1
+
+                with conn:
+                    for chunk in _chunked(to_insert, self.IMPORT_CHUNK):
+                        conn.executemany("""
+                            INSERT INTO workers (fio, position, contacts, schedule, fio_key)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, chunk)
+                    for chunk in _chunked(list(to_update.values()), self.IMPORT_CHUNK):
+                        cur = conn.executemany(_SQL_UPDATE_WORKER_BY_KEY, chunk)
+                        updated += cur.rowcount
+                self.cache.invalidate()
+                added = len(to_insert)
+                if added or updated:
+                    self._index = None  # после импорта индекс проще построить заново
+                    self.signals.changed.emit(ChangeSet(reset=True))
+
+            return {"added": added, "updated": updated, "skipped": skipped, "errors": errors}
 
         except Exception as e:
-            return {"added": added, "skipped": skipped, "errors": [f"Ошибка чтения файла: {e}"]}
+            return {"added": 0, "updated": 0, "skipped": skipped, "errors": [f"Ошибка чтения файла: {e}"]}
+
     def get_all(self):
+        return list(self.cache.get("workers", self._load_all))
+
+    def _load_all(self):
         with _connect(self.db_path) as conn:
             cur = conn.execute("SELECT id, fio, contacts, schedule, position FROM workers ORDER BY fio")
-            return [self._row_to_worker(row) for row in cur.fetchall()]
+            return [
+                Worker(worker_id, fio, contacts or "—", schedule, position)
+                for worker_id, fio, contacts, schedule, position in cur
+            ]
+
+    def get_many(self, worker_ids) -> list:
+        rows = _select_by_ids(
+            _connect(self.db_path),
+            "SELECT id, fio, contacts, schedule, position FROM workers WHERE id IN ({ids})",
+            worker_ids
+        )
+        return [
+            Worker(worker_id, fio, contacts or "—", schedule, position)
+            for worker_id, fio, contacts, schedule, position in rows
+        ]
+
+    def _worker_index(self) -> WorkerIndex:
+        """
+        Поисковый индекс сотрудников: строится из get_all() при первом поиске,
+        дальше обновляется add/update/delete. Перестраивается, если файл БД изменили снаружи.
+        """
+        self.cache.check_external_changes()
+        if self._index is None or self._index_changes != self.cache.external_changes:
+            index = WorkerIndex()
+            index.load(self.get_all())
+            self._index = index
+            self._index_changes = self.cache.external_changes
+        return self._index
+
+    def search(self, fio: str = "", position: str = "", contacts: str = "") -> list:
+        """Сотрудники, у которых ФИО, должность и контакты содержат заданные подстроки (без учёта регистра)."""
+        return self._worker_index().search(fio, position, contacts)
 
     def add(self, fio: str, position: str, contacts: str = "", schedule: str = "Пн-Пт 9:00-18:00"):
         with _connect(self.db_path) as conn:
-            conn.execute("INSERT INTO workers (fio, position, contacts, schedule) VALUES (?, ?, ?, ?)",
-                         (fio, position, contacts, schedule))
+            cur = conn.execute("INSERT INTO workers (fio, position, contacts, schedule, fio_key) VALUES (?, ?, ?, ?, ?)",
+                               (fio, position, contacts, schedule, fio_key(fio)))
             conn.commit()
+        self.cache.invalidate()
+        inserted = self.get_many([cur.lastrowid])
+        if self._index is not None:
+            for worker in inserted:
+                self._index.add(worker)
+        self.signals.changed.emit(ChangeSet(inserted=inserted))
 
     def update(self, worker_id: int, fio: str, position: str, contacts: str, schedule: str):
         with _connect(self.db_path) as conn:
             conn.execute("""
-                UPDATE workers SET fio=?, position=?, contacts=?, schedule=?
+                UPDATE workers SET fio=?, position=?, contacts=?, schedule=?, fio_key=?
                 WHERE id=?
-            """, (fio, position, contacts, schedule, worker_id))
+            """, (fio, position, contacts, schedule, fio_key(fio), worker_id))
             conn.commit()
+        self.cache.invalidate()
+        updated = self.get_many([worker_id])
+        if self._index is not None:
+            for worker in updated:
+                self._index.update(worker)
+        self.signals.changed.emit(ChangeSet(updated=updated))
 
     def delete(self, worker_id: int):
-        with _connect(self.db_path) as conn:
-            conn.execute("DELETE FROM workers WHERE id=?", (worker_id,))
-            conn.commit()
+        self.delete_many([worker_id])
 
-    def _row_to_worker(self, row):
-        return type('Worker', (), {
-            'id': row[0],
-            'fio': row[1],
-            'contacts': row[2] or "—",
-            'schedule': row[3],
-            'position': row[4]
-        })()
\ No newline at end of file
+    def delete_many(self, worker_ids: list[int]) -> dict:
+        """
+        Удаляет сотрудников одной транзакцией.
+        Возвращает {worker_id: True, если запись была и удалена}.
+        """
+        worker_ids = list(worker_ids)
+        existing = set()
+
+        conn = _connect(self.db_path)
+        with conn:
+            for chunk in _chunked(worker_ids):
+                ids = _placeholders(len(chunk))
+                existing.update(worker_id for (worker_id,) in conn.execute(
+                    f"SELECT id FROM workers WHERE id IN ({ids})", chunk
+                ))
+                conn.execute(f"DELETE FROM workers WHERE id IN ({ids})", chunk)
+        self.cache.invalidate()
+        if self._index is not None:
+            for worker_id in existing:
+                self._index.remove(worker_id)
+        if existing:
+            self.signals.changed.emit(ChangeSet(deleted=existing))
+
+        return {worker_id: worker_id in existing for worker_id in worker_ids}
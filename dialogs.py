@@ -78,23 +78,15 @@ class AddGuestsDialog(QtWidgets.QDialog):
 
         date_start_str = start_qdate.toString("dd.MM.yyyy")
         date_end_str = end_qdate.toString("dd.MM.yyyy")
-        # 3. Проверка: номер свободен?
-        if not self.client_db.is_room_available(room_id, date_start_str, date_end_str):
-            QtWidgets.QMessageBox.warning(
-                self,
-                "Номер занят!",
-                f"Номер уже забронирован на период:\n{date_start_str} — {date_end_str}\n\n"
-                "Выберите другие даты или другой номер."
-            )
-            return False
 
-        # 4. Проверка количества мест
+        # 3. Проверка количества мест: номер на несколько мест можно делить с другими бронями,
+        # важен только пик гостей по дням периода
         room = self.client_db.get_room_by_id(room_id)
         if not room:
             QtWidgets.QMessageBox.warning(self, "Ошибка", "Номер не найден в базе!")
             return False
 
-        current_occupancy = self.client_db.get_current_occupancy(room_id, date_start_str, date_end_str)
+        current_occupancy = self.client_db.get_peak_occupancy(room_id, date_start_str, date_end_str)
         new_guests = len([w for w in self.guest_widgets if w[0].text().strip()])
 
         if current_occupancy + new_guests > room.capacity:
@@ -107,7 +99,7 @@ class AddGuestsDialog(QtWidgets.QDialog):
             )
             return False
 
-        # 5. Минимум один гость
+        # 4. Минимум один гость
         if new_guests == 0:
             QtWidgets.QMessageBox.warning(self, "Нет гостей", "Добавьте хотя бы одного гостя!")
             return False
@@ -240,13 +232,14 @@ class AddGuestsDialog(QtWidgets.QDialog):
         if self.validate():
             super().accept()
 class EditClientDialog(QtWidgets.QDialog):
-    def __init__(self, client_db, room_repo, parent=None):
+    def __init__(self, client_db, room_repo, parent=None, client_id=None):
         super().__init__(parent)
         self.setWindowTitle("Добавить клиента")
         self.setMinimumWidth(420)
 
         self.client_db = client_db
         self.room_repo = room_repo
+        self.client_id = client_id  # собственная бронь не считается пересечением
         layout = QtWidgets.QVBoxLayout(self)
 
         form = QtWidgets.QFormLayout()
@@ -304,12 +297,19 @@ class EditClientDialog(QtWidgets.QDialog):
             return False
         date_start_str = start_qdate.toString("dd.MM.yyyy")
         date_end_str = end_qdate.toString("dd.MM.yyyy")
-        # 3. Проверка: номер свободен?
-        if not self.client_db.is_room_available(room_id, date_start_str, date_end_str):
+        # 3. Проверка количества мест (сама редактируемая бронь не считается)
+        room = self.client_db.get_room_by_id(room_id)
+        if not room:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", "Номер не найден в базе!")
+            return False
+        current_occupancy = self.client_db.get_peak_occupancy(room_id, date_start_str, date_end_str,
+                                                              exclude_client_id=self.client_id)
+        if current_occupancy + 1 > room.capacity:
             QtWidgets.QMessageBox.warning(
                 self,
-                "Номер занят!",
-                f"Номер уже забронирован на период:\n{date_start_str} — {date_end_str}\n\n"
+                "Нет мест!",
+                f"В номере {room.number} только {room.capacity} мест(а),\n"
+                f"на период {date_start_str} — {date_end_str} все заняты.\n\n"
                 "Выберите другие даты или другой номер."
             )
             return False
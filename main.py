@@ -8,7 +8,7 @@ from controllers.rooms import RoomController
 from controllers.workers import WorkerController
 from controllers.report import ReportController
 import sys
-from database import UserRepository, ClientRepository, RoomRepository, WorkerRepository
+from database import UserRepository, ClientRepository, RoomRepository, WorkerRepository, connection_manager
 from dialogs import LoginDialog
 
 
@@ -21,19 +21,17 @@ class HotelApp(QtWidgets.QMainWindow, UI_Hotel_App):
         self.setupUi(self)
         self.csv = FileCSVService()
         self.export = FileExportService()
-        self.clients_ctrl = ClientController(self, self.tableWidgetClients, self.room_repo, self.client_repo)
-        self.room_ctrl = RoomController(self, self.tableWidget_Rooms, self.room_repo)
+        self.clients_ctrl = ClientController(self, self.tableViewClients, self.room_repo, self.client_repo)
+        self.room_ctrl = RoomController(self, self.tableViewRooms, self.room_repo)
         self.work_ctrl = WorkerController(self, self.tableWidget_Workers, self.worker_repo)
         self.report_ctrl = ReportController(self, self.client_repo, self.room_repo)
         self.menu_ctrl = MenuController(self, self.csv, self.export, self.client_repo, self.room_repo, self.worker_repo)
 
-        self.clients_ctrl.clients_changed.connect(self.room_ctrl.load_rooms)
-
-        self.menu_ctrl.signals.csv_imported_clients.connect(self.clients_ctrl.load_clients_from_db)
-        self.menu_ctrl.signals.csv_imported_rooms.connect(self.room_ctrl.load_rooms)
-        self.menu_ctrl.signals.csv_imported_workers.connect(self.work_ctrl.load_workers)
+        # Таблицы обновляются по сигналам репозиториев (signals.changed): контроллеры
+        # сами правят затронутые строки, а после импорта CSV перечитывают таблицу целиком.
 def main():
     app = QtWidgets.QApplication(sys.argv)
+    app.aboutToQuit.connect(connection_manager.close)
 
     UserRepository()
 
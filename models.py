@@ -0,0 +1,67 @@
+class Room:
+    """Номер гостиницы (строка таблицы rooms)."""
+    __slots__ = ("id", "number", "room_type", "capacity", "price", "status")
+
+    def __init__(self, id, number, room_type, capacity, price, status):
+        self.id = id
+        self.number = number
+        self.room_type = room_type
+        self.capacity = capacity
+        self.price = price
+        self.status = status
+
+    def __repr__(self):
+        return f"Room(id={self.id}, number={self.number}, room_type={self.room_type!r})"
+
+
+class Worker:
+    """Сотрудник (строка таблицы workers)."""
+    __slots__ = ("id", "fio", "contacts", "schedule", "position")
+
+    def __init__(self, id, fio, contacts, schedule, position):
+        self.id = id
+        self.fio = fio
+        self.contacts = contacts
+        self.schedule = schedule
+        self.position = position
+
+    def __repr__(self):
+        return f"Worker(id={self.id}, fio={self.fio!r})"
+
+
+class Booking:
+    """Бронь клиента вместе с данными номера (clients JOIN rooms), даты — 'дд.мм.гггг'."""
+    __slots__ = ("id", "fio", "room_number", "room_type", "date_start", "date_end", "room_id")
+
+    def __init__(self, id, fio, room_number, room_type, date_start, date_end, room_id):
+        self.id = id
+        self.fio = fio
+        self.room_number = room_number
+        self.room_type = room_type
+        self.date_start = date_start
+        self.date_end = date_end
+        self.room_id = room_id
+
+    def __repr__(self):
+        return f"Booking(id={self.id}, fio={self.fio!r}, room_number={self.room_number})"
+
+
+class ChangeSet:
+    """
+    Изменения таблицы после записи через репозиторий (аргумент сигнала changed).
+
+    inserted / updated — записи целиком (Room, Worker, Booking),
+    deleted — id удалённых строк, reset=True — массовое изменение (импорт),
+    после которого проще перечитать таблицу целиком.
+    """
+    __slots__ = ("inserted", "updated", "deleted", "reset")
+
+    def __init__(self, inserted=(), updated=(), deleted=(), reset=False):
+        self.inserted = list(inserted)
+        self.updated = list(updated)
+        self.deleted = list(deleted)
+        self.reset = reset
+
+    def __repr__(self):
+        return (f"ChangeSet(inserted={len(self.inserted)}, updated={len(self.updated)}, "
+                f"deleted={len(self.deleted)}, reset={self.reset})")
@@ -0,0 +1,99 @@
+from datetime import date
+from itertools import chain
+
+import numpy as np
+
+
+def _difference(rows, starts, stops, height: int, width: int) -> np.ndarray:
+    """
+    Разностная матрица height × width: +1 в (row, start) и −1 в (row, stop) для
+    каждой тройки. cumsum по строке даёт, сколько отрезков [start, stop) покрывают столбец.
+    """
+    size = height * width
+    plus = np.bincount(rows * width + starts, minlength=size)
+    minus = np.bincount(rows * width + stops, minlength=size)
+    return (plus - minus).reshape(height, width)
+
+
+class OccupancyMatrix:
+    """
+    Загрузка номеров за окно дат [first_day, last_day] в виде плотной матрицы
+    номера × дни: headcount — число броней (гостей) в номере в этот день (uint16),
+    occupied — маска «номер занят».
+
+    Матрица строится без обхода ночей: каждая бронь, обрезанная по окну, даёт
+    +1 в день заезда и −1 в день после выезда (difference array, np.bincount),
+    а cumsum по дням превращает это в число гостей. Показатели за любой период
+    внутри окна — свёртки столбцов (np.add.reduceat), по номерам — строк.
+    """
+
+    def __init__(self, room_ids, first_day: date, last_day: date, bookings):
+        """
+        room_ids — порядок строк матрицы; bookings — итерируемое
+        (client_id, room_id, start, end), start/end — date.toordinal() (выезд включён).
+        Брони номеров не из room_ids и вне окна не учитываются.
+        """
+        self.room_ids = list(room_ids)
+        self.first_day = first_day
+        self.last_day = last_day
+        first, last = first_day.toordinal(), last_day.toordinal()
+        days = last - first + 1
+
+        data = np.fromiter(chain.from_iterable(bookings), dtype=np.int64).reshape(-1, 4)
+        room_ids = np.array(self.room_ids, dtype=np.int64)
+        # room_id → строка матрицы через таблицу поиска (id номеров — небольшие целые)
+        lookup = np.full(max(room_ids.max(initial=0), data[:, 1].max(initial=0)) + 1, -1, dtype=np.int64)
+        lookup[room_ids] = np.arange(len(room_ids))
+        rows = lookup[data[:, 1]]
+        inside = (rows >= 0) & (data[:, 2] <= last) & (data[:, 3] >= first)
+
+        self._rows = rows[inside]
+        self._starts = data[inside, 2] - first  # индексы дней, могут выходить за окно
+        self._ends = data[inside, 3] - first
+
+        diff = _difference(self._rows, np.maximum(self._starts, 0), np.minimum(self._ends, days - 1) + 1,
+                           len(self.room_ids), days + 1)
+        self.headcount = np.cumsum(diff[:, :days], axis=1).astype(np.uint16)
+        self.occupied = self.headcount > 0
+
+    @property
+    def days(self) -> int:
+        return self.headcount.shape[1]
+
+    def day_index(self, day: date) -> int:
+        """Столбец матрицы для дня day."""
+        return day.toordinal() - self.first_day.toordinal()
+
+    def occupied_days(self, bounds) -> np.ndarray:
+        """
+        Занятые дни по номерам и периодам: матрица номера × периоды.
+        bounds — [(first_day, last_day)] подряд идущих периодов, покрывающих окно.
+        """
+        starts = [self.day_index(first) for first, _ in bounds]
+        return np.add.reduceat(self.occupied, starts, axis=1, dtype=np.int64)
+
+    def guests(self, bounds) -> np.ndarray:
+        """
+        Число броней, пересекающих каждый период, по номерам: матрица номера × периоды.
+        Бронь пересекает отрезок подряд идущих периодов — снова difference array, уже по периодам.
+        """
+        period_starts = np.array([self.day_index(first) for first, _ in bounds])
+        period_ends = np.array([self.day_index(last) for _, last in bounds])
+        first_period = np.searchsorted(period_ends, self._starts)  # первый период, где end >= start брони
+        last_period = np.searchsorted(period_starts, self._ends, side="right") - 1
+
+        diff = _difference(self._rows, first_period, last_period + 1, len(self.room_ids), len(bounds) + 1)
+        return np.cumsum(diff[:, :-1], axis=1)
+
+    def carried_in(self, bounds) -> np.ndarray:
+        """
+        Число броней, начавшихся раньше периода и продолжающихся в нём, по номерам:
+        матрица номера × периоды. Бронь переходит во все периоды после того,
+        в котором (или до которого) она началась, и до своего последнего.
+        """
+        period_starts = np.array([self.day_index(first) for first, _ in bounds])
+        first_carried = np.searchsorted(period_starts, self._starts, side="right")  # первый период позже заезда
+        last_period = np.searchsorted(period_starts, self._ends, side="right") - 1
+
+        diff = _difference(self._rows, first_carried, last_period + 1, len(self.room_ids), len(bounds) + 1)
+        return np.cumsum(diff[:, :-1], axis=1)
@@ -0,0 +1,211 @@
+import calendar
+from datetime import date, timedelta
+
+try:
+    from occupancy import OccupancyMatrix
+except ImportError:  # без numpy отчёт считается интервалами на Python
+    OccupancyMatrix = None
+
+# Длина периода отчёта в месяцах
+PERIOD_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+
+def month_bounds(year: int, month: int) -> tuple:
+    """Первый и последний день месяца (date)."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def period_bounds(first_day: date, last_day: date, period: str | None = None) -> list:
+    """
+    Делит окно [first_day, last_day] на подряд идущие периоды: "month", "quarter"
+    или "year" (по календарю, крайние обрезаются по окну); None — всё окно целиком.
+    """
+    if period is None:
+        return [(first_day, last_day)]
+    step = PERIOD_MONTHS[period]
+    bounds = []
+    start = first_day
+    while start <= last_day:
+        # конец календарного периода, в который попадает start
+        month = (start.month - 1) // step * step + step
+        end = min(month_bounds(start.year, month)[1], last_day)
+        bounds.append((start, end))
+        start = end + timedelta(days=1)
+    return bounds
+
+
+def merge_intervals(intervals) -> list:
+    """
+    Объединяет интервалы дней [start, end] (оба конца включены) в непересекающиеся.
+    Соседние интервалы (конец + 1 == начало следующего) склеиваются. O(n log n).
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def occupied_days(intervals, first: int, last: int) -> int:
+    """Сколько дней из [first, last] покрыто хотя бы одним интервалом."""
+    clipped = [(max(start, first), min(end, last)) for start, end in intervals if start <= last and end >= first]
+    return sum(end - start + 1 for start, end in merge_intervals(clipped))
+
+
+class RoomStats:
+    """
+    Показатели одного номера за период отчёта.
+    carried_in — сколько из guests броней началось до периода (нужно, чтобы
+    сложить гостей соседних периодов, не считая переходящие брони дважды).
+    """
+    __slots__ = ("room", "days", "occupied_days", "guests", "carried_in")
+
+    def __init__(self, room, days: int, occupied_days: int = 0, guests: int = 0, carried_in: int = 0):
+        self.room = room
+        self.days = days
+        self.occupied_days = occupied_days
+        self.guests = guests
+        self.carried_in = carried_in
+
+    @property
+    def free_days(self) -> int:
+        return self.days - self.occupied_days
+
+    @property
+    def load(self) -> float:
+        """Загрузка, % (до десятых)."""
+        return round(self.occupied_days / self.days * 100, 1) if self.days else 0
+
+    @property
+    def income(self) -> int:
+        return self.occupied_days * self.room.price
+
+    def __repr__(self):
+        return f"RoomStats(room={self.room.number}, occupied_days={self.occupied_days}, guests={self.guests})"
+
+
+class Report:
+    """Отчёт по номерам за период [first_day, last_day]: RoomStats в порядке номеров и итоги."""
+    __slots__ = ("first_day", "last_day", "rooms")
+
+    def __init__(self, first_day: date, last_day: date, rooms: list):
+        self.first_day = first_day
+        self.last_day = last_day
+        self.rooms = rooms
+
+    @property
+    def days(self) -> int:
+        return (self.last_day - self.first_day).days + 1
+
+    @property
+    def income(self) -> int:
+        return sum(stats.income for stats in self.rooms)
+
+    @property
+    def occupied_days(self) -> int:
+        return sum(stats.occupied_days for stats in self.rooms)
+
+    @property
+    def guests(self) -> int:
+        return sum(stats.guests for stats in self.rooms)
+
+    @property
+    def load(self) -> float:
+        """Средняя загрузка всех номеров, %."""
+        capacity = len(self.rooms) * self.days
+        return round(self.occupied_days / capacity * 100, 1) if capacity else 0
+
+
+def _count(rooms, bookings, first_day: date, last_day: date, bounds) -> tuple:
+    """
+    Занятые дни, гости и переходящие брони по номерам для подряд идущих периодов
+    bounds окна [first_day, last_day] за один проход по броням.
+    Возвращает (occupied, guests, carried_in): [row][n] — номер rooms[row] в периоде bounds[n].
+
+    С numpy строится одна OccupancyMatrix на всё окно, показатели — суммы её столбцов.
+    Без numpy брони каждого номера обрезаются по периоду и объединяются
+    (пересекающиеся брони не считают день дважды): занятые дни — сумма длин
+    интервалов, O(b log b) на b броней.
+    """
+    if OccupancyMatrix is not None:
+        matrix = OccupancyMatrix([room.id for room in rooms], first_day, last_day, bookings)
+        return (matrix.occupied_days(bounds).tolist(), matrix.guests(bounds).tolist(),
+                matrix.carried_in(bounds).tolist())
+
+    first, last = first_day.toordinal(), last_day.toordinal()
+    intervals = {room.id: [] for room in rooms}
+    for _, room_id, start, end in bookings:
+        room_intervals = intervals.get(room_id)
+        if room_intervals is not None and start <= last and end >= first:
+            room_intervals.append((start, end))
+
+    occupied, guests, carried_in = [], [], []
+    for room in rooms:
+        room_occupied, room_guests, room_carried = [], [], []
+        for period_first, period_last in bounds:
+            period_first, period_last = period_first.toordinal(), period_last.toordinal()
+            overlapping = [(start, end) for start, end in intervals[room.id]
+                           if start <= period_last and end >= period_first]
+            room_occupied.append(occupied_days(overlapping, period_first, period_last))
+            room_guests.append(len(overlapping))
+            room_carried.append(sum(1 for start, _ in overlapping if start < period_first))
+        occupied.append(room_occupied)
+        guests.append(room_guests)
+        carried_in.append(room_carried)
+    return occupied, guests, carried_in
+
+
+def rollup(reports) -> Report:
+    """
+    Сводный отчёт по подряд идущим периодам reports (одни и те же номера в том же порядке).
+    Занятые дни складываются; гости — тоже, но без переходящих броней всех периодов,
+    кроме первого: бронь через границу периодов — один гость.
+    """
+    first, rest = reports[0], reports[1:]
+    return Report(first.first_day, reports[-1].last_day, [
+        RoomStats(
+            stats.room,
+            sum(report.rooms[row].days for report in reports),
+            sum(report.rooms[row].occupied_days for report in reports),
+            sum(report.rooms[row].guests for report in reports)
+            - sum(report.rooms[row].carried_in for report in rest),
+            stats.carried_in,
+        )
+        for row, stats in enumerate(first.rooms)
+    ])
+
+
+def build_range_report(rooms, bookings, first_day: date, last_day: date, period: str | None = "month") -> tuple:
+    """
+    Отчёты по периодам окна [first_day, last_day] (см. period_bounds) и сводный
+    отчёт за всё окно — из одного прохода по броням.
+
+    rooms — список Room; bookings — список (client_id, room_id, start, end),
+    start/end — date.toordinal() дней заезда и выезда (выезд включён).
+    Гости — число броней номера, пересекающих период; доход — занятые дни × цена.
+    Возвращает ([Report по периодам], Report за окно).
+    """
+    bounds = period_bounds(first_day, last_day, period)
+    occupied, guests, carried_in = _count(rooms, bookings, first_day, last_day, bounds)
+
+    reports = [
+        Report(first, last, [
+            RoomStats(room, (last - first).days + 1, occupied[row][n], guests[row][n], carried_in[row][n])
+            for row, room in enumerate(rooms)
+        ])
+        for n, (first, last) in enumerate(bounds)
+    ]
+    return reports, rollup(reports)
+
+
+def build_reports(rooms, bookings, first_day: date, last_day: date, period: str | None = None) -> list:
+    """Отчёты по периодам окна [first_day, last_day] (см. build_range_report)."""
+    return build_range_report(rooms, bookings, first_day, last_day, period)[0]
+
+
+def build_report(rooms, bookings, first_day: date, last_day: date) -> Report:
+    """Отчёт за период [first_day, last_day] целиком (см. build_range_report)."""
+    return build_range_report(rooms, bookings, first_day, last_day, None)[1]
@@ -8,6 +8,17 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
 
+def _header_text(model, column, default):
+    header = model.headerData(column, QtCore.Qt.Horizontal)
+    return str(header) if header is not None else default
+
+
+def _cell_text(model, row, column):
+    """Текст ячейки через модель — одинаково для QTableWidget и QTableView с любой моделью."""
+    value = model.index(row, column).data()
+    return str(value) if value is not None else ""
+
+
 class FileCSVService:
     """Загрузка и сохранение CSV."""
 
@@ -20,8 +31,9 @@ class FileCSVService:
             if filepath is None:
                 return False
 
-            row_count = table.rowCount()
-            col_count = table.columnCount()
+            model = table.model()
+            row_count = model.rowCount()
+            col_count = model.columnCount()
 
             with open(filepath, "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f, delimiter=delimiter)
@@ -29,22 +41,14 @@ class FileCSVService:
                 # Заголовки
                 headers = []
                 for i in range(col_count):
-                    header_item = table.horizontalHeaderItem(i)
-                    if header_item:
-                        headers.append(header_item.text())
-                    else:
-                        headers.append(f"Колонка {i + 1}")
+                    headers.append(_header_text(model, i, f"Колонка {i + 1}"))
                 writer.writerow(headers)
 
                 # Строки данных
                 for row in range(row_count):
                     row_data = []
                     for col in range(col_count):
-                        item = table.item(row, col)
-                        if item and item.text():
-                            row_data.append(item.text().strip())
-                        else:
-                            row_data.append("")
+                        row_data.append(_cell_text(model, row, col).strip())
                     writer.writerow(row_data)
 
             return True
@@ -61,37 +65,29 @@ class FileExportService:
 
     def export_table_to_html(self, table, path):
         try:
-            html = "<html><head><meta charset='utf-8'></head><body>"
-            html += "<table border='1' cellspacing='0' cellpadding='4'>"
-
-            # --------- Заголовок ---------
-            html += "<tr>"
-            for c in range(table.columnCount()):
-                if table.isColumnHidden(c):
-                    continue
+            model = table.model()
+            visible_columns = [c for c in range(model.columnCount()) if not table.isColumnHidden(c)]
 
-                header_item = table.horizontalHeaderItem(c)
-                header_text = header_item.text() if header_item else f"Column {c}"
+            parts = ["<html><head><meta charset='utf-8'></head><body>",
+                     "<table border='1' cellspacing='0' cellpadding='4'>"]
 
-                html += f"<th>{header_text}</th>"
-            html += "</tr>"
+            # --------- Заголовок ---------
+            parts.append("<tr>")
+            for c in visible_columns:
+                parts.append(f"<th>{_header_text(model, c, f'Column {c}')}</th>")
+            parts.append("</tr>")
 
             # --------- Строки ---------
-            for r in range(table.rowCount()):
-                html += "<tr>"
-                for c in range(table.columnCount()):
-                    if table.isColumnHidden(c):
-                        continue
-
-                    item = table.item(r, c)
-                    cell_text = item.text() if item else ""
-                    html += f"<td>{cell_text}</td>"
-                html += "</tr>"
+            for r in range(model.rowCount()):
+                parts.append("<tr>")
+                for c in visible_columns:
+                    parts.append(f"<td>{_cell_text(model, r, c)}</td>")
+                parts.append("</tr>")
 
-            html += "</table></body></html>"
+            parts.append("</table></body></html>")
 
             with open(path, "w", encoding="utf-8") as f:
-                f.write(html)
+                f.write("".join(parts))
 
             return True
 
@@ -127,23 +123,22 @@ class FileExportService:
             headers = []
             visible_columns = []
 
-            for c in range(table.columnCount()):
+            model = table.model()
+            for c in range(model.columnCount()):
                 if table.isColumnHidden(c):
                     continue
                 visible_columns.append(c)
-                header_item = table.horizontalHeaderItem(c)
-                header_text = header_item.text() if header_item else f"Колонка {c}"
+                header_text = _header_text(model, c, f"Колонка {c}")
                 headers.append(Paragraph(header_text, ParagraphStyle(
                     name='Header', fontName='Arial-Bold', fontSize=10
                 )))
             data.append(headers)
 
             # Строки с переносом текста
-            for r in range(table.rowCount()):
+            for r in range(model.rowCount()):
                 row = []
                 for c in visible_columns:
-                    item = table.item(r, c)
-                    text = item.text() if item else ""
+                    text = _cell_text(model, r, c)
                     para = Paragraph(text, ParagraphStyle(
                         name='Cell',
                         fontName='Arial',
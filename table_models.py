@@ -0,0 +1,330 @@
+import bisect
+from array import array
+from datetime import date
+
+from PyQt5 import QtCore, QtGui
+
+
+def _day(date_str: str) -> int:
+    """'15.03.2025' → порядковый номер дня (date.toordinal)"""
+    return date(int(date_str[6:10]), int(date_str[3:5]), int(date_str[0:2])).toordinal()
+
+
+def _day_text(day: int) -> str:
+    return date.fromordinal(day).strftime("%d.%m.%Y")
+
+
+class ClientTableModel(QtCore.QAbstractTableModel):
+    """
+    Модель вкладки «Клиенты» для QTableView.
+
+    Строки хранятся по колонкам: числа — в array (id, номер комнаты, дни
+    заезда/выезда), ФИО — в списке строк. Текст ячейки собирается в data()
+    только для строк, которые представление действительно рисует, поэтому
+    ни объектов-ячеек, ни готовых строк дат на каждую бронь не создаётся.
+
+    Порядок строк — по (дате заезда, id) по убыванию, как у ClientRepository.get_page.
+    Строки приходят страницами: set_bookings() кладёт первую, а следующие
+    QTableView догружает сам через canFetchMore()/fetchMore(), когда таблицу
+    прокручивают до конца; next_page(after) получает ключ последней строки.
+    Экспорт таблицы догружает все оставшиеся строки одним запросом — fetch_all().
+    """
+    HEADERS = ["ФИО", "Номер комнаты", "Заезд", "Выезд", "ID"]
+    ID_COLUMN = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = array("q")
+        self._room_ids = array("q")
+        self._room_numbers = array("q")
+        self._starts = array("l")
+        self._ends = array("l")
+        self._fios = []
+        self._next_page = None  # next_page(after, limit=...) → [Booking]; None — загружено всё
+
+    # ---------- Qt ----------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._next_page is not None
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._next_page(self.last_key()) if self._ids else []
+        if not page:
+            self._next_page = None
+            return
+
+        first = len(self._ids)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(page) - 1)
+        self._append(page)
+        self.endInsertRows()
+
+    def fetch_all(self):
+        """Догружает все оставшиеся страницы одним запросом (next_page без лимита)."""
+        if not self.canFetchMore():
+            return
+        page = self._next_page(self.last_key(), limit=None) if self._ids else []
+        self._next_page = None
+        if page:
+            first = len(self._ids)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(page) - 1)
+            self._append(page)
+            self.endInsertRows()
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        row, column = index.row(), index.column()
+        if column == 0:
+            return self._fios[row]
+        if column == 1:
+            return str(self._room_numbers[row])
+        if column == 2:
+            return _day_text(self._starts[row])
+        if column == 3:
+            return _day_text(self._ends[row])
+        return str(self._ids[row])
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    # ---------- Загрузка и точечные изменения ----------
+    def set_bookings(self, bookings, next_page=None):
+        """
+        Полностью заменяет строки модели списком Booking.
+        next_page(after, limit=...) — загрузчик следующей страницы (limit=None — всех
+        оставшихся строк); None, если bookings — это всё.
+        """
+        self.beginResetModel()
+        for column in (self._ids, self._room_ids, self._room_numbers, self._starts, self._ends, self._fios):
+            del column[:]
+        self._append(bookings)
+        self._next_page = next_page
+        self.endResetModel()
+
+    def _append(self, bookings):
+        self._ids.extend(b.id for b in bookings)
+        self._room_ids.extend(b.room_id for b in bookings)
+        self._room_numbers.extend(b.room_number for b in bookings)
+        self._starts.extend(_day(b.date_start) for b in bookings)
+        self._ends.extend(_day(b.date_end) for b in bookings)
+        self._fios.extend(b.fio for b in bookings)
+
+    def insert_booking(self, booking):
+        """
+        Вставляет бронь на её место по (дате заезда, id). Бронь, которая встаёт
+        после последней загруженной строки, пропускается, пока есть страницы:
+        её загрузит fetchMore(), а ключ последней строки не перепрыгнет непрочитанные.
+        """
+        start = _day(booking.date_start)
+        row = bisect.bisect_right(range(len(self._starts)), (-start, -booking.id),
+                                  key=lambda r: (-self._starts[r], -self._ids[r]))
+        if row == len(self._ids) and self._next_page is not None:
+            return
+
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._ids.insert(row, booking.id)
+        self._room_ids.insert(row, booking.room_id)
+        self._room_numbers.insert(row, booking.room_number)
+        self._starts.insert(row, start)
+        self._ends.insert(row, _day(booking.date_end))
+        self._fios.insert(row, booking.fio)
+        self.endInsertRows()
+
+    def remove_client(self, client_id: int) -> bool:
+        row = self.row_of(client_id)
+        if row < 0:
+            return False
+
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        for column in (self._ids, self._room_ids, self._room_numbers, self._starts, self._ends, self._fios):
+            del column[row]
+        self.endRemoveRows()
+        return True
+
+    def set_room_number(self, room_id: int, number: int):
+        """Номер комнаты переименован: правим колонку у всех её броней."""
+        changed = [row for row, value in enumerate(self._room_ids) if value == room_id]
+        for row in changed:
+            self._room_numbers[row] = number
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], 1), self.index(changed[-1], 1))
+
+    # ---------- Доступ к строкам ----------
+    def row_of(self, client_id: int) -> int:
+        try:
+            return self._ids.index(client_id)
+        except ValueError:
+            return -1
+
+    def client_id(self, row: int) -> int:
+        return self._ids[row]
+
+    def last_key(self) -> tuple:
+        """Ключ страницы после последней строки: (date_start ISO, id), как ClientRepository.page_key."""
+        return date.fromordinal(self._starts[-1]).isoformat(), self._ids[-1]
+
+
+class RoomTableModel(QtCore.QAbstractTableModel):
+    """
+    Модель вкладки «Номера»: список Room, отсортированный по номеру комнаты.
+
+    Статус не хранится в строках: колонка «Статус» берёт его из status_loader()
+    (словарь {room_id: (status, status_text, color)}), который вызывается лениво —
+    при первой отрисовке или фильтрации по статусу после сброса (refresh_statuses:
+    после записи и при каждой смене фильтров). Кисти и шрифт
+    статуса создаются один раз и общие для всех строк.
+    """
+    HEADERS = ["№", "Тип", "Вместимость", "Цена за день", "Статус", "ID"]
+    STATUS_COLUMN = 4
+    ID_COLUMN = 5
+    DEFAULT_STATUS = ("free", "Свободен", "#28a745")
+
+    def __init__(self, status_loader, parent=None):
+        super().__init__(parent)
+        self._status_loader = status_loader
+        self._statuses = None
+        self._rooms = []
+        self._status_font = QtGui.QFont("Segoe UI", 10, QtGui.QFont.Bold)
+        self._brushes = {}  # цвет → QBrush
+
+    # ---------- Qt ----------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rooms)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        room, column = self._rooms[index.row()], index.column()
+
+        if column == self.STATUS_COLUMN:
+            if role == QtCore.Qt.DisplayRole:
+                return self.status_of(room.id)[1]
+            if role == QtCore.Qt.ForegroundRole:
+                return self._brush(self.status_of(room.id)[2])
+            if role == QtCore.Qt.FontRole:
+                return self._status_font
+            if role == QtCore.Qt.TextAlignmentRole:
+                return QtCore.Qt.AlignCenter
+            return None
+
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if column == 0:
+            return str(room.number)
+        if column == 1:
+            return room.room_type
+        if column == 2:
+            return str(room.capacity)
+        if column == 3:
+            return f"{room.price} ₽"
+        return str(room.id)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _brush(self, color: str):
+        brush = self._brushes.get(color)
+        if brush is None:
+            brush = self._brushes[color] = QtGui.QBrush(QtGui.QColor(color))
+        return brush
+
+    # ---------- Статусы ----------
+    def status_of(self, room_id: int) -> tuple:
+        if self._statuses is None:
+            self._statuses = self._status_loader()
+        return self._statuses.get(room_id, self.DEFAULT_STATUS)
+
+    def refresh_statuses(self, room_ids=None):
+        """Сбрасывает статусы; перерисовываются строки room_ids (None — все)."""
+        self._statuses = None
+        if room_ids is None:
+            if self._rooms:
+                self.dataChanged.emit(self.index(0, self.STATUS_COLUMN),
+                                      self.index(len(self._rooms) - 1, self.STATUS_COLUMN))
+            return
+        for room_id in room_ids:
+            row = self.row_of(room_id)
+            if row >= 0:
+                index = self.index(row, self.STATUS_COLUMN)
+                self.dataChanged.emit(index, index)
+
+    # ---------- Загрузка и точечные изменения ----------
+    def set_rooms(self, rooms):
+        self.beginResetModel()
+        self._rooms = list(rooms)
+        self._statuses = None
+        self.endResetModel()
+
+    def upsert_room(self, room):
+        """Добавляет номер или заменяет его строку, сохраняя порядок по номеру комнаты."""
+        self.remove_room(room.id)
+        row = bisect.bisect_right(self._rooms, room.number, key=lambda r: r.number)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._rooms.insert(row, room)
+        self.endInsertRows()
+
+    def remove_room(self, room_id: int) -> bool:
+        row = self.row_of(room_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._rooms[row]
+        self.endRemoveRows()
+        return True
+
+    # ---------- Доступ к строкам ----------
+    def row_of(self, room_id: int) -> int:
+        return next((row for row, room in enumerate(self._rooms) if room.id == room_id), -1)
+
+    def room(self, row: int):
+        return self._rooms[row]
+
+
+class RoomFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """
+    Фильтры вкладки «Номера» (вместимость, тип, статус) поверх RoomTableModel.
+    Смена фильтра — только invalidateFilter(), исходная модель не перестраивается.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._capacity = "Все"
+        self._room_type = "Все"
+        self._status = "Все"
+
+    def set_filters(self, capacity: str, room_type: str, status: str):
+        self._capacity, self._room_type, self._status = capacity, room_type, status
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        room = model.room(source_row)
+
+        if self._capacity == "5+":
+            if room.capacity < 5:
+                return False
+        elif self._capacity != "Все" and room.capacity != int(self._capacity):
+            return False
+
+        if self._room_type != "Все" and room.room_type != self._room_type:
+            return False
+
+        if self._status == "Свободен":
+            return model.status_of(room.id)[0] == "free"
+        if self._status == "Занят":
+            return model.status_of(room.id)[0] == "busy"
+        return True
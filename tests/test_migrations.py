@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from database import ClientRepository, RoomRepository, WorkerRepository, connection_manager
+
+
+class DateMigrationTest(unittest.TestCase):
+    """Даты броней из старых баз (как их сохранял прежний импорт CSV) переводятся в ISO."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._dir.name, "hotel.db")
+
+    def tearDown(self):
+        connection_manager.close()
+        self._dir.cleanup()
+
+    def _legacy_db(self, *bookings):
+        """База версии 0: даты в том виде, в каком их записал прежний код."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE rooms (id INTEGER PRIMARY KEY AUTOINCREMENT, number INTEGER UNIQUE NOT NULL, "
+                         "room_type TEXT NOT NULL, capacity INTEGER NOT NULL, price INTEGER NOT NULL, "
+                         "status TEXT DEFAULT 'free')")
+            conn.execute("CREATE TABLE clients (id INTEGER PRIMARY KEY AUTOINCREMENT, fio TEXT NOT NULL, "
+                         "room_id INTEGER NOT NULL, date_start TEXT NOT NULL, date_end TEXT NOT NULL)")
+            conn.execute("INSERT INTO rooms (number, room_type, capacity, price) VALUES (101, 'Стандарт', 2, 1000)")
+            conn.executemany("INSERT INTO clients (fio, room_id, date_start, date_end) VALUES (?, 1, ?, ?)", bookings)
+        conn.close()
+
+    def _open(self):
+        rooms = RoomRepository(self.db_path)
+        clients = ClientRepository(rooms, self.db_path)
+        WorkerRepository(self.db_path)
+        return clients
+
+    def _user_version(self):
+        return connection_manager.get(self.db_path).execute("PRAGMA user_version").fetchone()[0]
+
+    def test_dates_without_leading_zeros(self):
+        self._legacy_db(("Иванов Иван", "15.03.2025", "20.03.2025"), ("Петров Пётр", "1.2.2025", "5.2.2025"))
+        clients = self._open()
+
+        rows = connection_manager.get(self.db_path).execute(
+            "SELECT date_start, date_end FROM clients ORDER BY id").fetchall()
+        self.assertEqual(rows, [("2025-03-15", "2025-03-20"), ("2025-02-01", "2025-02-05")])
+        self.assertEqual(clients.get_peak_occupancy(1, "01.02.2025", "31.03.2025"), 1)
+
+    def test_unparseable_date_stops_migration(self):
+        self._legacy_db(("Иванов Иван", "15.03.2025", "20.03.2025"), ("Петров Пётр", "вчера", "5.2.2025"))
+        with self.assertRaises(ValueError):
+            self._open()
+        self.assertEqual(self._user_version(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+
+from database import ClientRepository, RoomRepository, WorkerRepository, connection_manager, find_full_scans
+
+
+class QueryPlanTest(unittest.TestCase):
+    """Горячие запросы (HOT_QUERIES) должны идти по индексам, а не полным сканированием."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._dir.name, "hotel.db")
+        # схему строят сами репозитории — со всеми миграциями
+        rooms = RoomRepository(self.db_path)
+        ClientRepository(rooms, self.db_path)
+        WorkerRepository(self.db_path)
+
+    def tearDown(self):
+        connection_manager.close()
+        self._dir.cleanup()
+
+    def test_hot_queries_use_indexes(self):
+        self.assertEqual(find_full_scans(self.db_path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from models import Worker
+from worker_index import WorkerIndex, worker_matches
+
+
+class WorkerIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.workers = [
+            Worker(1, "Петров Пётр", "+7 900 111-22-33", "Пн-Пт 9:00-18:00", "Администратор"),
+            Worker(2, "Петрова Анна", "anna@hotel.ru", "Пн-Пт 9:00-18:00", "Горничная"),
+            Worker(3, "Иванов Иван", "+7 900 444-55-66", "Сб-Вс", "Администратор"),
+        ]
+        self.index = WorkerIndex()
+        self.index.load(self.workers)
+
+    def assertSearch(self, **filters):
+        expected = sorted((worker for worker in self.workers if worker_matches(worker, **filters)),
+                          key=lambda worker: (worker.fio, worker.id))
+        self.assertEqual([w.id for w in self.index.search(**filters)], [w.id for w in expected])
+
+    def test_single_field(self):
+        self.assertSearch(fio="петр")
+        self.assertSearch(position="админ")
+        self.assertSearch(fio="ПЁТР")
+
+    def test_multi_field(self):
+        self.assertSearch(fio="петр", position="админ")
+        self.assertSearch(fio="ив", contacts="900")
+
+    def test_multi_field_with_missing_trigram(self):
+        # кандидаты от первого поля есть, триграммы второго в индексе нет
+        self.assertEqual(self.index.search(fio="петр", position="zzzz"), [])
+        self.assertEqual(self.index.search(fio="zzzz", position="админ"), [])
+
+    def test_update_and_remove(self):
+        self.index.update(Worker(2, "Сидорова Анна", "anna@hotel.ru", "Пн-Пт", "Горничная"))
+        self.index.remove(3)
+        self.assertEqual([w.id for w in self.index.search(fio="петр")], [1])
+        self.assertEqual([w.id for w in self.index.search(fio="сидор")], [2])
+        self.assertEqual(self.index.search(fio="иван"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
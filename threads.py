@@ -2,6 +2,11 @@ from PyQt5 import QtCore
 import xml.etree.ElementTree as ET
 import time
 import os
+import threading
+
+from database import connection_manager
+
+
 class LoadDataThread(QtCore.QThread):
     """
     Асинхронно загружает XML-файл и передаёт корневой элемент в основной поток.
@@ -201,4 +206,136 @@ class HTMLReportThread(QtCore.QThread):
 
         except Exception as e:
             print("Ошибка при создании HTML:", e)
-            self.finished.emit("")
\ No newline at end of file
+            self.finished.emit("")
+
+
+class ClientSearchThread(QtCore.QThread):
+    """
+    Поиск клиентов по ФИО (и номеру комнаты) в фоновом потоке.
+
+    Ищет первую страницу (limit строк); остальные догружает модель таблицы.
+    Если передан base — полные результаты прошлого поиска, строку которого
+    продолжает текущая, — отбор идёт по ним в памяти, без запроса к БД.
+    Отмена — requestInterruption(): поиск прерывается и ничего не отдаёт.
+
+    Signals:
+        found(int, object): Номер запроса (generation) и список Booking.
+    """
+    found = QtCore.pyqtSignal(int, object)  # generation, [Booking]
+
+    CHECK_EVERY = 1000
+
+    def __init__(self, client_repo, fio_text: str, room_id, generation: int, base=None, limit=None):
+        """
+        Args:
+            client_repo (ClientRepository): Репозиторий клиентов.
+            fio_text (str): Подстрока ФИО.
+            room_id (int | None): Номер комнаты или None — все номера.
+            generation (int): Номер запроса, по нему контроллер отбрасывает устаревшие ответы.
+            base (list | None): Результаты прошлого поиска для сужения.
+            limit (int | None): Сколько строк искать (страница), None — все.
+        """
+        super().__init__()
+        self.client_repo = client_repo
+        self.fio_text = fio_text
+        self.room_id = room_id
+        self.generation = generation
+        self.base = base
+        self.limit = limit
+
+    def run(self):
+        try:
+            if self.base is not None:
+                results = self._narrow()
+            else:
+                results = self.client_repo.search(
+                    self.fio_text, self.room_id, should_stop=self.isInterruptionRequested, limit=self.limit
+                )
+        finally:
+            # у каждого потока своё соединение — закрываем его вместе с потоком
+            connection_manager.close()
+
+        if results is not None and not self.isInterruptionRequested():
+            self.found.emit(self.generation, results)
+
+    def _narrow(self):
+        needle = self.fio_text.strip().lower()
+        results = []
+        for n, client in enumerate(self.base):
+            if n % self.CHECK_EVERY == 0 and self.isInterruptionRequested():
+                return None
+            if needle in client.fio.lower():
+                results.append(client)
+        return results
+
+
+class ReportSignals(QtCore.QObject):
+    """
+    Сигналы ReportTask (QRunnable — не QObject и сам сигналы отправлять не может).
+    Один объект на все задачи контроллера: задачу удаляет пул сразу после run(),
+    а сигналы должны жить дольше неё.
+
+    Signals:
+        progress(object, int, int): Задача ReportTask, готово месяцев, всего месяцев.
+        finished(object, object): Задача и результат get_range_report — (месячные, сводный);
+            ``None`` — расчёт отменён.
+        failed(object, str): Задача и текст ошибки.
+    """
+    progress = QtCore.pyqtSignal(object, int, int)
+    finished = QtCore.pyqtSignal(object, object)
+    failed = QtCore.pyqtSignal(object, str)
+
+
+class ReportTask(QtCore.QRunnable):
+    """
+    Расчёт отчёта по номерам за период в пуле потоков (QThreadPool).
+
+    Отмена — cancel(): расчёт прерывается между месяцами,
+    и finished приходит с None.
+
+    Показатели закрытых месяцев поток в monthly_room_stats не пишет, а копит
+    в stats_rows: их сохраняет GUI-поток (ClientRepository.save_monthly_stats)
+    после finished — если данные за время расчёта не менялись.
+    """
+
+    def __init__(self, client_repo, rooms, first_day, last_day, signals):
+        """
+        Args:
+            client_repo (ClientRepository): Репозиторий клиентов.
+            rooms (list[Room]): Номера отчёта — читаются в GUI-потоке (RoomRepository.get_all),
+                чтобы задача не заполняла общий QueryCache.
+            first_day (datetime.date): Первый день периода (начало месяца).
+            last_day (datetime.date): Последний день периода (конец месяца).
+            signals (ReportSignals): Куда сообщать о ходе расчёта.
+        """
+        super().__init__()
+        self.client_repo = client_repo
+        self.rooms = rooms
+        self.key = (first_day, last_day)
+        self.signals = signals
+        self.stats_rows = []
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            result = self.client_repo.get_range_report(
+                *self.key,
+                should_stop=self.is_cancelled,
+                progress=lambda done, total: self.signals.progress.emit(self, done, total),
+                store=self.stats_rows.extend,
+                rooms=self.rooms,
+            )
+        except Exception as e:
+            self.signals.failed.emit(self, str(e))
+            return
+        finally:
+            # потоки пула переиспользуются — соединение закрываем после каждой задачи
+            connection_manager.close()
+
+        self.signals.finished.emit(self, None if self.is_cancelled() else result)
@@ -146,18 +146,15 @@ class UI_Hotel_App():
 
         self.tabClientsLayout.addWidget(formFrame)
 
-        # таблица клиентов
-        self.tableWidgetClients = QtWidgets.QTableWidget(self.tab)
+        # таблица клиентов — QTableView, модель (и скрытая колонка ID) задаётся в ClientController
+        self.tableViewClients = QtWidgets.QTableView(self.tab)
+        self.tableViewClients.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tableViewClients.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
 
-        self.tableWidgetClients.setColumnCount(5)
-        self.tableWidgetClients.setHorizontalHeaderLabels(["ФИО", "Номер комнаты", "Заезд", "Выезд", "ID"])
-        self.tableWidgetClients.setColumnHidden(4, True)  # скрываем ID
-        self.tableWidgetClients.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-
-        self.tableWidgetClients.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tableWidgetClients.setAlternatingRowColors(True)
-        self.tableWidgetClients.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        self.tabClientsLayout.addWidget(self.tableWidgetClients)
+        self.tableViewClients.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tableViewClients.setAlternatingRowColors(True)
+        self.tableViewClients.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        self.tabClientsLayout.addWidget(self.tableViewClients)
 
         # нижняя панель кнопок
         bottomWidget = QtWidgets.QWidget(self.tab)
@@ -218,15 +215,14 @@ class UI_Hotel_App():
 
         self.tabRoomsLayout.addWidget(formFrame2)
 
-        # таблица номеров
-        self.tableWidget_Rooms = QtWidgets.QTableWidget(self.tab_2)
-        self.tableWidget_Rooms.setColumnCount(6)
-        self.tableWidget_Rooms.setHorizontalHeaderLabels(["№", "Тип", "Вместимость", "Цена за день", "Статус", "ID"])
-        self.tableWidget_Rooms.setColumnHidden(5, True)
-        self.tableWidget_Rooms.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tableWidget_Rooms.setAlternatingRowColors(True)
-        self.tableWidget_Rooms.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        self.tabRoomsLayout.addWidget(self.tableWidget_Rooms)
+        # таблица номеров — QTableView, модель и прокси с фильтрами задаются в RoomController
+        self.tableViewRooms = QtWidgets.QTableView(self.tab_2)
+        self.tableViewRooms.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tableViewRooms.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tableViewRooms.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tableViewRooms.setAlternatingRowColors(True)
+        self.tableViewRooms.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        self.tabRoomsLayout.addWidget(self.tableViewRooms)
 
         # нижняя панель кнопок
         bottomWidget2 = QtWidgets.QWidget(self.tab_2)
@@ -313,8 +309,8 @@ class UI_Hotel_App():
         self.tabReportsLayout.setContentsMargins(10, 10, 10, 10)
         self.tabReportsLayout.setSpacing(12)
 
-        # === Группа "Отчёт за месяц" с ComboBox ===
-        self.groupBox_Report = QtWidgets.QGroupBox("Отчёт за месяц", self.tab_4)
+        # === Группа "Отчёт за период": месяц начала и месяц конца ===
+        self.groupBox_Report = QtWidgets.QGroupBox("Отчёт за период", self.tab_4)
         self.groupBox_Report.setStyleSheet("""
             QGroupBox {
                 font-weight: bold;
@@ -336,13 +332,17 @@ class UI_Hotel_App():
 
         label_month = QtWidgets.QLabel("Выберите месяц:")
         label_month.setFixedWidth(150)
+        label_month_end = QtWidgets.QLabel("по")
 
-        # Красивый ComboBox с месяцами и годами
+        # Красивые ComboBox с месяцами и годами: начало и конец периода
+        # (одинаковые — отчёт за один месяц)
         self.comboBox_MonthYear = QtWidgets.QComboBox()
-        self.comboBox_MonthYear.setFixedHeight(36)
-        self.comboBox_MonthYear.setMinimumWidth(220)
+        self.comboBox_MonthYearEnd = QtWidgets.QComboBox()
         font_combo = QtGui.QFont("Segoe UI", 10)
-        self.comboBox_MonthYear.setFont(font_combo)
+        for combo in (self.comboBox_MonthYear, self.comboBox_MonthYearEnd):
+            combo.setFixedHeight(36)
+            combo.setMinimumWidth(220)
+            combo.setFont(font_combo)
 
         # Заполняем: 3 года назад → 2 года вперёд
         current_date = QtCore.QDate.currentDate()
@@ -361,12 +361,14 @@ class UI_Hotel_App():
                 date = QtCore.QDate(year, month_idx, 1)
                 display_text = f"{month_name} {year}"
                 self.comboBox_MonthYear.addItem(display_text, date)
+                self.comboBox_MonthYearEnd.addItem(display_text, date)
 
                 # Выбираем текущий месяц по умолчанию
                 if year == current_year and month_idx == current_month:
                     selected_index = self.comboBox_MonthYear.count() - 1
 
         self.comboBox_MonthYear.setCurrentIndex(selected_index)
+        self.comboBox_MonthYearEnd.setCurrentIndex(selected_index)
 
         # Кнопка формирования отчёта
         self.pushButtonCreateReport = QtWidgets.QPushButton("Сформировать отчёт")
@@ -385,6 +387,8 @@ class UI_Hotel_App():
 
         group_layout.addWidget(label_month)
         group_layout.addWidget(self.comboBox_MonthYear)
+        group_layout.addWidget(label_month_end)
+        group_layout.addWidget(self.comboBox_MonthYearEnd)
         group_layout.addStretch()
         group_layout.addWidget(self.pushButtonCreateReport)
 
@@ -0,0 +1,107 @@
+FIELDS = ("fio", "position", "contacts")
+
+GRAM = 3
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к виду для поиска: без регистра, «ё» = «е», одиночные пробелы."""
+    return " ".join((text or "").split()).casefold().replace("ё", "е")
+
+
+def _grams(text: str) -> set:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def worker_matches(worker, fio: str = "", position: str = "", contacts: str = "") -> bool:
+    """Подходит ли сотрудник под фильтры (подстроки без учёта регистра) — без индекса."""
+    for field, query in zip(FIELDS, (fio, position, contacts)):
+        query = normalize(query)
+        if query and query not in normalize(getattr(worker, field)):
+            return False
+    return True
+
+
+class WorkerIndex:
+    """
+    Индекс сотрудников в памяти для поиска по подстроке в ФИО, должности и контактах.
+
+    По каждому полю хранится нормализованный текст и posting-списки триграмм:
+    {триграмма: {worker_id}}. Кандидаты на запрос — пересечение множеств всех
+    его триграмм (от самого короткого), по всем заполненным фильтрам сразу;
+    затем кандидаты проверяются точным вхождением подстроки. Запрос короче
+    триграммы проверяется только среди кандидатов других полей (или всех).
+
+    Загружается один раз и дальше поддерживается репозиторием при add/update/delete.
+    """
+
+    def __init__(self):
+        self._workers = {}  # worker_id → Worker
+        self._texts = {field: {} for field in FIELDS}     # поле → {worker_id: нормализованный текст}
+        self._postings = {field: {} for field in FIELDS}  # поле → {триграмма: {worker_id}}
+
+    def load(self, workers):
+        self._workers.clear()
+        for field in FIELDS:
+            self._texts[field].clear()
+            self._postings[field].clear()
+        for worker in workers:
+            self.add(worker)
+
+    def add(self, worker):
+        self._workers[worker.id] = worker
+        for field in FIELDS:
+            text = normalize(getattr(worker, field))
+            self._texts[field][worker.id] = text
+            postings = self._postings[field]
+            for gram in _grams(text):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = set()
+                ids.add(worker.id)
+
+    def remove(self, worker_id: int):
+        if self._workers.pop(worker_id, None) is None:
+            return
+        for field in FIELDS:
+            text = self._texts[field].pop(worker_id)
+            postings = self._postings[field]
+            for gram in _grams(text):
+                ids = postings[gram]
+                ids.discard(worker_id)
+                if not ids:
+                    del postings[gram]
+
+    def update(self, worker):
+        self.remove(worker.id)
+        self.add(worker)
+
+    def search(self, fio: str = "", position: str = "", contacts: str = "") -> list:
+        """Сотрудники, у которых каждое заполненное поле содержит свою подстроку; по ФИО."""
+        queries = [(field, normalize(query)) for field, query in zip(FIELDS, (fio, position, contacts))]
+        queries = [(field, query) for field, query in queries if query]
+
+        candidates = None
+        for field, query in queries:
+            if len(query) < GRAM:
+                continue
+            postings = self._postings[field]
+            # нет триграммы в индексе — пустое множество, пересечение сразу пусто
+            lists = sorted((postings.get(gram, frozenset()) for gram in _grams(query)), key=len)
+            for ids in lists:
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+
+        if candidates is None:
+            candidates = self._workers.keys()
+
+        # триграммы дают кандидатов, точное вхождение проверяется по тексту
+        results = [
+            self._workers[worker_id] for worker_id in candidates
+            if all(query in self._texts[field][worker_id] for field, query in queries)
+        ]
+        results.sort(key=lambda worker: (worker.fio, worker.id))
+        return results
+
+    def __len__(self):
+        return len(self._workers)